@@ -0,0 +1,113 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Background Moves
+
+Module Description
+===============================
+This Python module contains the class that lets an AI choose its move in a background thread, so
+that the thread running a pygame window can keep drawing the window and handling its events
+(e.g., the user closing the window) while the AI is thinking. Without it, the window stops
+responding for as long as the AI takes to choose a move.
+
+The AI makes its move in its own copy of the game, so the game being drawn never shows the moves
+that the AI is trying out. Once the AI has chosen, the move is made in the real game.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Optional
+import threading
+from connect_four import ConnectFourGame
+from players import PlayerAI
+
+
+class BackgroundMove:
+    """A move that an AI is choosing in a background thread.
+
+    >>> from players import MinimaxPlayer
+    >>> game = ConnectFourGame()
+    >>> background_move = BackgroundMove(MinimaxPlayer(depth=2, delay=0), game, None)
+    >>> background_move.wait()
+    3
+    >>> background_move.is_done()
+    True
+    >>> game.get_moves_made()
+    0
+    """
+    # Private Instance Attributes:
+    #   - _game: the copy of the game that the AI makes its move in
+    #   - _stop: the event that tells the AI to make its best move found so far
+    #   - _thread: the thread the AI is choosing its move in
+    #   - _move: the move the AI made, or None if it has not made one yet
+    #   - _error: the exception raised by the AI while choosing its move, or None if it has not
+    #             raised one
+    _game: ConnectFourGame
+    _stop: threading.Event
+    _thread: threading.Thread
+    _move: Optional[int]
+    _error: Optional[BaseException]
+
+    def __init__(self, player: PlayerAI, game: ConnectFourGame,
+                 previous_move: Optional[int]) -> None:
+        """Start <player> choosing a move in the current state of <game> in a background thread,
+        where <previous_move> is its opponent's most recent move.
+
+        <game> is not changed: call wait or stop to get the move, and then make it in <game>.
+        <player> must not be used by any other thread until the move has been chosen.
+
+        Preconditions:
+            - There is at least one valid move for the given game
+        """
+        self._game = game.copy()
+        self._stop = threading.Event()
+        self._move = None
+        self._error = None
+        self._thread = threading.Thread(target=self._make_move, args=(player, previous_move),
+                                        daemon=True)
+        self._thread.start()
+
+    def is_done(self) -> bool:
+        """Return whether the AI has finished choosing its move."""
+        return not self._thread.is_alive()
+
+    def wait(self) -> int:
+        """Wait for the AI to finish choosing its move, and return the move.
+
+        Re-raise the exception raised by the AI if it raised one.
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._move
+
+    def stop(self) -> int:
+        """Tell the AI to make the best move it has found so far, wait for it to do so, and return
+        the move (see PlayerAI.make_move).
+
+        Re-raise the exception raised by the AI if it raised one.
+        """
+        self._stop.set()
+        return self.wait()
+
+    def _make_move(self, player: PlayerAI, previous_move: Optional[int]) -> None:
+        """Make <player>'s move in self._game, and record the move (or the exception raised)."""
+        try:
+            self._move = player.make_move(self._game, previous_move, self._stop)
+        except BaseException as error:
+            self._error = error
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'threading', 'connect_four', 'players'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136', 'W0703']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,306 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Benchmarks
+
+Module Description
+===============================
+This Python module contains the benchmark suite that measures how fast the minimax algorithm is,
+so that changes to the game (connect_four.py) or to the search (game_tree.py) can be checked for
+regressions.
+
+The benchmark searches a fixed set of positions (openings, middlegames, tactical positions and
+near-endgames) to a fixed depth each, and reports the number of game states searched, how long the
+search took, the number of game states searched per second, the peak memory used, and the move
+chosen. The results can be saved as a baseline, and later results compared to it: a position that
+searches more game states or chooses a different move than in the baseline is reported as a
+regression. The number of game states searched is the same on every run, so it is what the
+benchmark fails on. Timings vary from run to run (by more than half on a busy machine), so a
+position that takes much longer than in the baseline is only reported as a warning.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Optional
+import json
+import time
+import tracemalloc
+import game_tree
+from connect_four import ConnectFourGame
+from move_ordering import MoveOrdering
+from transposition import TranspositionTable
+
+# Global Constants
+# The positions of the benchmark, grouped into sets. Each position is given by its name, the
+# columns of the moves made to reach it from an empty board (with red moving first), and the depth
+# it is searched to.
+POSITIONS = {
+    'opening': [('empty', '', 10), ('centre-reply', '33', 9), ('four-ply', '3324', 10)],
+    'middlegame': [('middle-a', '1353313315', 9), ('middle-b', '414435333443', 9),
+                   ('middle-c', '24303323224334', 9), ('middle-d', '5236222333', 9)],
+    'tactical': [('threat', '334400', 9), ('double-threat', '3243532', 9)],
+    'endgame': [('end-a', '1353313315153551150404', 12),
+                ('end-b', '16003211333311134444446550', 14),
+                ('end-c', '4144353334431114311000', 12),
+                ('end-d', '1600321133331113444444', 12)]
+}
+
+# The number of entries in the transposition table of each search
+TABLE_SIZE = 2 ** 18
+
+# How many more game states (as a fraction of the baseline) a search can search before it is a
+# regression
+NODES_TOLERANCE = 0.0
+
+# How much slower (as a fraction of the baseline time, plus a number of seconds) a search can be
+# before a warning is given. Timings of the same search vary by more than half from run to run,
+# and short searches vary the most relative to their time.
+TIME_TOLERANCE = 1.0
+TIME_FLOOR = 0.1
+
+
+class BenchmarkRegression(Exception):
+    """Exception raised when the results of the benchmark are worse than its baseline.
+
+    Instance Attributes:
+        - regressions: a description of each regression
+    """
+    regressions: list[str]
+
+    def __init__(self, regressions: list[str]) -> None:
+        """Initialize a new BenchmarkRegression for the given regressions."""
+        super().__init__()
+        self.regressions = regressions
+
+    def __str__(self) -> str:
+        """Return a string representation of this exception."""
+        return f'{len(self.regressions)} benchmark regression(s):\n' + '\n'.join(self.regressions)
+
+
+def search_position(moves: str, depth: int, trace_memory: bool = False,
+                    algorithm: str = game_tree.ALPHA_BETA) -> dict:
+    """Return the results of searching the position reached by making <moves> (a string of
+    column numbers) from an empty board, to depth <depth>, in the form
+    {'move': move chosen, 'nodes': game states searched, 'seconds': time taken}.
+
+    If <trace_memory> is True, the results also include 'peak_memory', the peak memory allocated
+    by the search in bytes (not including the transposition table, which is allocated before the
+    search starts). Tracing memory slows the search down, so the time taken is not accurate.
+
+    Every search starts with an empty transposition table and move ordering, so that its results
+    do not depend on earlier searches. <algorithm> is the search algorithm used (see
+    GameTree.minimax).
+
+    Preconditions:
+        - depth > 0
+        - the position reached by making <moves> is not over
+        - algorithm in {game_tree.ALPHA_BETA, game_tree.PVS}
+
+    >>> result = search_position('3324', 2)
+    >>> (result['move'], result['nodes'])
+    (3, 31)
+    >>> [search_position('3324', 4, algorithm=algorithm)['nodes']
+    ...  for algorithm in (game_tree.ALPHA_BETA, game_tree.PVS)]
+    [293, 246]
+    """
+    game = ConnectFourGame()
+    for move in moves:
+        game.make_move(int(move))
+
+    player = 'Red' if game.is_red_move() else 'Yellow'
+    tree = game_tree.GameTree(player, game_tree.ROOT_MOVE, game)
+    table, ordering = TranspositionTable(TABLE_SIZE), MoveOrdering()
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    move = tree.minimax(depth, table=table, ordering=ordering, algorithm=algorithm)
+    seconds = time.perf_counter() - start
+    result = {'move': move, 'nodes': tree.get_nodes_searched(), 'seconds': seconds}
+
+    if trace_memory:
+        _, result['peak_memory'] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result
+
+
+def run_benchmark(positions: Optional[dict[str, list[tuple[str, str, int]]]] = None,
+                  repeat: int = 3, algorithm: str = game_tree.ALPHA_BETA) -> dict[str, dict]:
+    """Search every position in <positions> (or POSITIONS if it is None), and return the results
+    of each search, keyed by '<set name>/<position name>'.
+
+    Each position is searched <repeat> times with the search algorithm <algorithm>, and the
+    fastest time is reported. The peak memory is measured on a separate search, since measuring
+    memory slows the search down. Results with different algorithms can be compared to each other
+    with compare_to_baseline.
+
+    The results of each position are of the form {'moves': ..., 'depth': ..., 'move': move chosen,
+    'nodes': game states searched, 'seconds': time taken, 'nodes_per_second': ...,
+    'peak_memory': peak memory allocated in bytes}.
+
+    Preconditions:
+        - repeat > 0
+        - algorithm in {game_tree.ALPHA_BETA, game_tree.PVS}
+
+    >>> results = run_benchmark({'tiny': [('empty', '', 2)]}, repeat=1)
+    >>> (results['tiny/empty']['move'], results['tiny/empty']['nodes'])
+    (3, 15)
+    """
+    if positions is None:
+        positions = POSITIONS
+
+    results = {}
+    for set_name, set_positions in positions.items():
+        for name, moves, depth in set_positions:
+            searches = [search_position(moves, depth, algorithm=algorithm)
+                        for _ in range(0, repeat)]
+            seconds = min(search['seconds'] for search in searches)
+
+            peak_memory = search_position(moves, depth, trace_memory=True,
+                                          algorithm=algorithm)['peak_memory']
+
+            results[f'{set_name}/{name}'] = {
+                'moves': moves, 'depth': depth, 'move': searches[0]['move'],
+                'nodes': searches[0]['nodes'], 'seconds': seconds,
+                'nodes_per_second': searches[0]['nodes'] / seconds if seconds > 0 else 0.0,
+                'peak_memory': peak_memory
+            }
+
+    return results
+
+
+def save_baseline(results: dict[str, dict], path: str) -> None:
+    """Save <results> (as returned by run_benchmark) to the JSON file at <path>, so that later
+    results can be compared to them."""
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+def compare_to_baseline(results: dict[str, dict], path: str,
+                        nodes_tolerance: float = NODES_TOLERANCE) -> list[str]:
+    """Return a description of every regression of <results> (as returned by run_benchmark)
+    compared to the baseline saved in the JSON file at <path>.
+
+    A position is a regression if it chose a different move than in the baseline, or searched
+    more than (1 + <nodes_tolerance>) times as many game states. Timings are not compared (see
+    compare_times). Positions that are not in both <results> and the baseline are ignored.
+
+    Preconditions:
+        - nodes_tolerance >= 0
+
+    >>> import os
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+    >>> results = {'tiny/empty': {'move': 3, 'nodes': 57, 'seconds': 0.01}}
+    >>> save_baseline(results, path)
+    >>> compare_to_baseline(results, path)
+    []
+    >>> compare_to_baseline({'tiny/empty': {'move': 2, 'nodes': 60, 'seconds': 0.5}}, path)
+    ['tiny/empty: chose move 2 instead of 3', 'tiny/empty: searched 60 nodes instead of 57']
+    """
+    with open(path) as file:
+        baseline = json.load(file)
+
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]
+
+        if result['move'] != expected['move']:
+            regressions.append(f'{key}: chose move {result["move"]} instead of {expected["move"]}')
+        if result['nodes'] > expected['nodes'] * (1 + nodes_tolerance):
+            regressions.append(f'{key}: searched {result["nodes"]} nodes instead of '
+                               f'{expected["nodes"]}')
+
+    return regressions
+
+
+def compare_times(results: dict[str, dict], path: str, time_tolerance: float = TIME_TOLERANCE,
+                  time_floor: float = TIME_FLOOR) -> list[str]:
+    """Return a description of every position in <results> (as returned by run_benchmark) that
+    took more than (1 + <time_tolerance>) times as long as in the baseline saved in the JSON file
+    at <path>, plus <time_floor> seconds. Positions that are not in both <results> and the
+    baseline are ignored.
+
+    Timings are too noisy to fail the benchmark on, so these are only meant as warnings.
+
+    Preconditions:
+        - time_tolerance >= 0
+        - time_floor >= 0
+
+    >>> import os
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+    >>> save_baseline({'tiny/empty': {'move': 3, 'nodes': 57, 'seconds': 0.5}}, path)
+    >>> compare_times({'tiny/empty': {'move': 3, 'nodes': 57, 'seconds': 1.05}}, path)
+    []
+    >>> compare_times({'tiny/empty': {'move': 3, 'nodes': 57, 'seconds': 1.2}}, path)
+    ['tiny/empty: took 1.200s instead of 0.500s']
+    """
+    with open(path) as file:
+        baseline = json.load(file)
+
+    slowdowns = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]
+
+        if result['seconds'] > expected['seconds'] * (1 + time_tolerance) + time_floor:
+            slowdowns.append(f'{key}: took {result["seconds"]:.3f}s instead of '
+                             f'{expected["seconds"]:.3f}s')
+
+    return slowdowns
+
+
+def check_benchmark(baseline_path: str, repeat: int = 3) -> dict[str, dict]:
+    """Run the benchmark, print its results, and compare them to the baseline saved in the JSON
+    file at <baseline_path>. Return the results.
+
+    Raise a BenchmarkRegression if there are any regressions. Positions that took much longer
+    than in the baseline are printed as warnings, but are not regressions.
+
+    Preconditions:
+        - repeat > 0
+    """
+    results = run_benchmark(repeat=repeat)
+    print_results(results)
+
+    for slowdown in compare_times(results, baseline_path):
+        print(f'Warning: {slowdown}')
+
+    regressions = compare_to_baseline(results, baseline_path)
+    if regressions != []:
+        raise BenchmarkRegression(regressions)
+
+    return results
+
+
+def print_results(results: dict[str, dict]) -> None:
+    """Print <results> (as returned by run_benchmark) as a table."""
+    print(f'{"position":<22} {"depth":>5} {"move":>4} {"nodes":>9} {"seconds":>8} '
+          f'{"nodes/s":>9} {"peak KiB":>9}')
+    for key, result in results.items():
+        print(f'{key:<22} {result["depth"]:>5} {result["move"]:>4} {result["nodes"]:>9} '
+              f'{result["seconds"]:>8.3f} {result["nodes_per_second"]:>9.0f} '
+              f'{result["peak_memory"] / 1024:>9.1f}')
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'json', 'time', 'tracemalloc', 'game_tree',
+                          'connect_four', 'move_ordering', 'transposition'],
+        'allowed-io': ['save_baseline', 'compare_to_baseline', 'compare_times',
+                       'check_benchmark', 'print_results'],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
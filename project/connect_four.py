@@ -6,22 +6,122 @@ This Python module contains the class that is used to represent games of Connect
 contains a collection of methods that govern a game of connect four (i.e, dropping pieces into
 the board, detecting when a game is over, etc.)
 
+Along with the piece in each cell, the pieces on the board are kept as a bitboard: two integers
+whose bits represent the cells of the board, one for the pieces of the player whose turn it is
+and one for all of the pieces on the board. Checking for a four in a row then takes a handful of
+integer operations instead of a scan over the board.
+
 Copyright Information
 ===============================
 This file is Copyright (c) 2021 Anis Singh.
 """
 from __future__ import annotations
 from typing import Optional
-import copy
+import random
 import numpy as np
+from evaluation import CENTRE_PIECE_WORTH, WINDOW_LENGTH, generate_windows, \
+    generate_cell_windows, generate_window_scores
 
 # Global Constants
 EMPTY_PIECE = 0
 RED_PIECE = 1
 YELLOW_PIECE = 2
 
+# The size of the board, and the number of pieces in a row needed to win, of a standard game
 _ROWS = 6
 _COLS = 7
+_CONNECT = WINDOW_LENGTH
+
+# The seed used to generate the random numbers that game states are hashed with. A fixed seed is
+# used so that a game state has the same hash every time this program is run.
+_ZOBRIST_SEED = 111
+
+
+def _generate_zobrist_keys(rows: int, cols: int) -> tuple[dict[int, list[list[int]]], int]:
+    """Return the random 64-bit numbers that are used to hash game states of a board with <rows>
+    rows and <cols> columns, in the form (piece_keys, red_move_key).
+
+    piece_keys maps each piece to a number for every cell of the board, and red_move_key is used
+    to tell apart game states with the same board but a different current player. The hash of a
+    game state is the XOR of the numbers for each piece on the board (and red_move_key if it is
+    red's move), which is known as Zobrist hashing.
+    """
+    rng = random.Random(_ZOBRIST_SEED)
+    piece_keys = {piece: [[rng.getrandbits(64) for _ in range(cols)] for _ in range(rows)]
+                  for piece in (RED_PIECE, YELLOW_PIECE)}
+    return (piece_keys, rng.getrandbits(64))
+
+
+# The tables calculated by _get_board_tables, keyed by the board size and number of pieces in a
+# row needed to win that they are for
+_BOARD_TABLES = {}
+
+
+def _get_board_tables(rows: int, cols: int, connect: int) \
+        -> tuple[dict[int, list[list[int]]], int, int, list[list[list[int]]], list[list[int]]]:
+    """Return the tables used by games with a board with <rows> rows and <cols> columns where
+    <connect> pieces in a row are needed to win, in the form
+    (piece_keys, red_move_key, windows, cell_windows, window_scores).
+
+    piece_keys and red_move_key are the Zobrist keys (see _generate_zobrist_keys), windows is the
+    number of windows of <connect> cells on the board, cell_windows lists the windows that
+    contain each cell (see evaluation.generate_cell_windows), and window_scores holds the score of
+    each window (see evaluation.generate_window_scores). The tables are only calculated once for
+    each board size, and are shared by every game of that size.
+
+    Preconditions:
+        - rows > 0 and cols > 0
+        - 2 <= connect <= max(rows, cols)
+    """
+    if (rows, cols, connect) not in _BOARD_TABLES:
+        piece_keys, red_move_key = _generate_zobrist_keys(rows, cols)
+        windows = generate_windows(rows, cols, connect)
+        _BOARD_TABLES[(rows, cols, connect)] = (
+            piece_keys, red_move_key, len(windows), generate_cell_windows(rows, cols, windows),
+            generate_window_scores(connect))
+
+    return _BOARD_TABLES[(rows, cols, connect)]
+
+
+# The shifts calculated by _get_win_shifts, keyed by the number of rows of the board and the
+# number of pieces in a row needed to win that they are for
+_WIN_SHIFTS = {}
+
+
+def _get_win_shifts(rows: int, connect: int) -> list[list[int]]:
+    """Return, for each direction a line can go in on a bitboard with <rows> rows, the shifts
+    that reduce a bitmask of pieces to the bitmask of the pieces that start <connect> of them in a
+    row in that direction (see ConnectFourGame._is_winning_move). The shifts are only calculated
+    once for each board size.
+
+    Each step ANDs the bitmask with itself shifted, which doubles the length of the lines that the
+    bitmask marks, so only about log2(<connect>) steps are needed for each direction.
+
+    Preconditions:
+        - rows > 0
+        - connect >= 2
+
+    >>> _get_win_shifts(6, 4)
+    [[1, 2], [7, 14], [6, 12], [8, 16]]
+    >>> _get_win_shifts(6, 5)[0]
+    [1, 2, 1]
+    """
+    if (rows, connect) not in _WIN_SHIFTS:
+        shifts = []
+        # Vertical, horizontal, "\" diagonal and "/" diagonal neighbours respectively
+        for direction in (1, rows + 1, rows, rows + 2):
+            steps, length = [], 1
+            while length * 2 <= connect:
+                steps.append(length * direction)
+                length *= 2
+            if length < connect:
+                # The bitmask marks lines of <length> >= <connect> / 2 pieces, so one more step
+                # that overlaps them reaches <connect>
+                steps.append((connect - length) * direction)
+            shifts.append(steps)
+        _WIN_SHIFTS[(rows, connect)] = shifts
+
+    return _WIN_SHIFTS[(rows, connect)]
 
 
 class ConnectFourGame:
@@ -45,43 +145,122 @@ class ConnectFourGame:
            [0., 0., 0., 1., 0., 0., 0.]])
     >>> game.get_winner() is None
     True
+    >>> game.undo_move()
+    >>> game.is_red_move()
+    False
+    >>> game.get_board()[-2:]
+    array([[0., 0., 0., 0., 0., 0., 0.],
+           [0., 0., 0., 1., 0., 0., 0.]])
     """
     # Private Instance Attributes:
-    #   - _board: a two-dimensional array representing a Connect Four board
-    #   - _valid_moves: a list of the valid moves for the current player
+    #   - _board: the piece in each cell of the board, stored as one byte per cell. The cell at
+    #             (row, col) is at index row * self._cols + col, where row 0 is the bottom row.
+    #   - _position: a bitmask of the cells that contain a piece of the current player
+    #   - _mask: a bitmask of the cells that contain a piece of either player
+    #   - _win_shifts: the shifts that find lines of self._connect pieces in a row in
+    #                  self._position (see _get_win_shifts)
+    #   - _heights: the number of pieces in each column of the board
+    #   - _valid_moves: a list of the valid moves for the current player. A new list is created
+    #                   whenever the valid moves change, so copies of a game can share it.
     #   - _rows: the number of rows of this board
     #   - _cols: the number of columns of this board
+    #   - _connect: the number of pieces in a row needed to win this game
     #   - _red_move: a boolean representing whether red is the current player
     #   - _moves_made: the total amount of moves that have been made in this game
+    #   - _moves: the columns of the moves that have been made in this game, in the order they
+    #             were made (used as a stack by undo_move)
     #   - _max_moves: the maximum possible number of moves that can be made before this game
     #                 must be over
-    _board: np.ndarray
+    #   - _winner: the winner of this game as returned by get_winner, which is calculated once
+    #              after every move
+    #   - _hash: the Zobrist hash of this game state, which is updated after every move
+    #   - _mirror_hash: the Zobrist hash of this game state with its board mirrored from left to
+    #                   right, which is updated after every move
+    #   - _zobrist_keys: the numbers that each piece in each cell is hashed with
+    #   - _red_move_key: the number that red being the current player is hashed with
+    #   - _window_counts: for each piece (at index piece - 1), how many of that piece are in
+    #                     each window of self._connect cells (in the same order as
+    #                     evaluation.generate_windows)
+    #   - _cell_windows: the indexes of the windows that contain each cell
+    #   - _window_scores: the score of a window with a number of the player's pieces and of the
+    #                     opponent's pieces (see evaluation.generate_window_scores)
+    #   - _evaluations: for each piece (at index piece - 1), the heuristic score of the board from
+    #                   the perspective of the player with that piece (see evaluation.py), which
+    #                   is updated after every move
+    #
+    # Each column of the bitmasks is represented by self._rows + 1 consecutive bits, starting
+    # with the bottom cell of the column. The extra bit at the top of each column is always 0, and
+    # stops four in a rows from "wrapping around" from the top of one column to the bottom of the
+    # next. Python integers have no fixed size, so boards of any size can be stored this way.
+    #
+    # Game states are copied for every game state of a retained GameTree, so instances use
+    # __slots__ rather than a __dict__, and store the board and window counts as bytes.
+    __slots__ = ('_board', '_position', '_mask', '_win_shifts', '_heights', '_valid_moves',
+                 '_red_move', '_rows', '_cols', '_connect', '_moves_made', '_moves', '_max_moves',
+                 '_winner', '_hash', '_mirror_hash', '_zobrist_keys', '_red_move_key',
+                 '_window_counts', '_cell_windows', '_window_scores', '_evaluations')
+    _board: bytearray
+    _position: int
+    _mask: int
+    _win_shifts: list[list[int]]
+    _heights: bytearray
     _valid_moves: list[int]
     _red_move: bool
     _rows: int
     _cols: int
+    _connect: int
     _moves_made: int
+    _moves: list[int]
     _max_moves: int
+    _winner: Optional[str]
+    _hash: int
+    _mirror_hash: int
+    _zobrist_keys: dict[int, list[list[int]]]
+    _red_move_key: int
+    _window_counts: list[bytearray]
+    _cell_windows: list[list[list[int]]]
+    _window_scores: list[list[int]]
+    _evaluations: list[int]
+
+    def __init__(self, red_move: bool = True, rows: int = _ROWS, cols: int = _COLS,
+                 connect: int = _CONNECT) -> None:
+        """Initialize a new Connect Four Game with a board that has <rows> rows and <cols>
+        columns, where <connect> pieces in a row are needed to win. Whether or not red is first to
+        move is determined by <red_move>.
 
-    def __init__(self, red_move: bool = True) -> None:
-        """Initialize a new Connect Four Game with a board that has 6 rows and 7 columns.
-        Whether or not red is first to move is determined by <red_move>.
-        """
-        # Note: I was originally planning on making it so connect four boards can have
-        # a customizable amount of rows and columns. This ended up adding too much
-        # complexity to my code, and I decided to discontinue it, but this is a feature I
-        # want to add to this program over the summer, so I did not want to re-configure my
-        # code to remove the potential to implement this. After speaking to David in office hours,
-        # he told me I should leave a comment in here explaining that this is why I'm using private
-        # instance attributes for the rows and columns of the board, rather than just using the
-        # constants defined at the top of the file.
-        self._rows = _ROWS
-        self._cols = _COLS
-        self._board = np.zeros((self._rows, self._cols))
+        Preconditions:
+            - rows > 0 and cols > 0
+            - 2 <= connect <= max(rows, cols)
+
+        >>> game = ConnectFourGame(rows=7, cols=9, connect=5)
+        >>> for move in [0, 0, 1, 1, 2, 2, 3, 3]:
+        ...     game.make_move(move)
+        >>> game.get_winner() is None
+        True
+        >>> game.make_move(4)
+        >>> game.get_winner()
+        'Red'
+        """
+        self._rows = rows
+        self._cols = cols
+        self._connect = connect
+        self._board = bytearray(rows * cols)
+        self._position = 0
+        self._mask = 0
+        self._win_shifts = _get_win_shifts(rows, connect)
+        self._heights = bytearray(cols)
         self._valid_moves = list(range(self._cols))
         self._red_move = red_move
         self._moves_made = 0
+        self._moves = []
         self._max_moves = self._rows * self._cols
+        self._winner = None
+        self._zobrist_keys, self._red_move_key, windows, self._cell_windows, \
+            self._window_scores = _get_board_tables(rows, cols, connect)
+        self._hash = self._red_move_key if red_move else 0
+        self._mirror_hash = self._hash
+        self._window_counts = [bytearray(windows), bytearray(windows)]
+        self._evaluations = [0, 0]
 
     def make_move(self, col: int) -> None:
         """Place a piece in the appropriate row for the column <col>.
@@ -94,21 +273,75 @@ class ConnectFourGame:
         # Check if move is valid
         if self.is_valid_move(col):
             # Get the appropriate row
-            row = self._get_row_for_move(col)
+            row = self._heights[col]
 
             # Mutate the game board
-            self._board[row][col] = RED_PIECE if self._red_move else YELLOW_PIECE
+            piece = RED_PIECE if self._red_move else YELLOW_PIECE
+            self._board[row * self._cols + col] = piece
+            self._heights[col] = row + 1
+
+            # Switch the position to the opponent's pieces, and then add the new piece to the mask
+            self._position ^= self._mask
+            self._mask |= 1 << (col * (self._rows + 1) + row)
         else:
             raise ValueError(f'Cannot place a piece in column "{col}"')
 
+        # Update the hashes with the new piece and the change of active player
+        self._hash ^= self._zobrist_keys[piece][row][col] ^ self._red_move_key
+        self._mirror_hash ^= self._zobrist_keys[piece][row][self._cols - 1 - col] \
+            ^ self._red_move_key
+        self._update_evaluations(row, col, piece, 1)
+
         # Change active player
         self._red_move = not self._red_move
 
         # Update moves made in this game
         self._moves_made += 1
+        self._moves.append(col)
+
+        # Only the column that was just played in can have become full
+        if row == self._rows - 1:
+            self._valid_moves = [move for move in self._valid_moves if move != col]
 
-        # Update the valid moves for the game state
-        self._calculate_valid_moves()
+        # Only the move that was just made can have ended the game
+        self._update_winner(row, col)
+
+    def undo_move(self) -> None:
+        """Take back the most recent move made in this game, restoring the game to the state
+        it was in before that move was made.
+
+        Raise a ValueError if no moves have been made in this game.
+        """
+        if self._moves == []:
+            raise ValueError('Cannot undo a move when no moves have been made')
+
+        col = self._moves.pop()
+
+        # The most recent move in a column is the highest piece in that column
+        row = self._heights[col] - 1
+        piece = YELLOW_PIECE if self._red_move else RED_PIECE
+        self._board[row * self._cols + col] = EMPTY_PIECE
+        self._heights[col] = row
+
+        # Remove the piece from the mask, and then switch the position back to the pieces of
+        # the player who made the move
+        self._mask ^= 1 << (col * (self._rows + 1) + row)
+        self._position ^= self._mask
+        self._hash ^= self._zobrist_keys[piece][row][col] ^ self._red_move_key
+        self._mirror_hash ^= self._zobrist_keys[piece][row][self._cols - 1 - col] \
+            ^ self._red_move_key
+        self._update_evaluations(row, col, piece, -1)
+
+        self._red_move = not self._red_move
+        self._moves_made -= 1
+
+        # Only the column that the move was taken back from can have stopped being full
+        if row == self._rows - 1:
+            self._valid_moves = sorted(self._valid_moves + [col])
+
+        # A move can only be made when the game is not over, so the game was not over before
+        # the move that was taken back
+        self._winner = None
 
     def is_valid_move(self, col: int) -> bool:
         """Check if a piece can be placed into the column <col> on the board.
@@ -116,11 +349,8 @@ class ConnectFourGame:
         Preconditions:
             - 0 <= col <= self.get_cols() - 1
         """
-        # A move is valid iff the top row of the column that the piece will be placed in
-        # is not filled.
-
-        # Want to return a bool instead of a numpy.bool_ object
-        return bool(self._board[self._rows - 1][col] == 0)
+        # A move is valid iff the column that the piece will be placed in is not filled.
+        return self._heights[col] < self._rows
 
     def get_valid_moves(self) -> list[int]:
         """Return a list of the valid columns for a player to drop a piece into."""
@@ -136,12 +366,24 @@ class ConnectFourGame:
             - the game was not previously over (i.e. only the most recent move could possibly
               cause the game to have ended).
         """
-        if self._moves_made >= self._max_moves:
-            return 'Draw'
-        elif self._is_winner():
-            return 'Yellow' if self._red_move else 'Red'
-        else:
-            return None
+        return self._winner
+
+    def copy(self) -> ConnectFourGame:
+        """Return a copy of this ConnectFourGame, which can be changed without changing this game.
+
+        >>> game = ConnectFourGame()
+        >>> game.make_move(3)
+        >>> copy_game = game.copy()
+        >>> copy_game.make_move(2)
+        >>> (game.get_moves_made(), copy_game.get_moves_made())
+        (1, 2)
+        >>> copy_game.undo_move()
+        >>> copy_game.get_hash() == game.get_hash()
+        True
+        """
+        new_game = ConnectFourGame.__new__(ConnectFourGame)
+        self._copy_state_to(new_game)
+        return new_game
 
     def copy_and_make_move(self, move: int) -> ConnectFourGame:
         """Make the given move in a copy of this ConnectFourGame, and return that copy.
@@ -149,16 +391,8 @@ class ConnectFourGame:
         If move is not a valid move, raise a ValueError.
         """
         if self.is_valid_move(move):
-            new_board = copy.deepcopy(self._board)
-            row = self._get_row_for_move(move)
-
-            # Mutate the new game board
-            new_board[row][move] = RED_PIECE if self._red_move else YELLOW_PIECE
-            # Create the new game instance
-            new_game = ConnectFourGame(red_move=not self._red_move)
-            # Update instance attributes
-            new_game._board, new_game._moves_made = new_board, self._moves_made + 1
-            new_game._calculate_valid_moves()
+            new_game = self.copy()
+            new_game.make_move(move)
             return new_game
         else:
             raise ValueError(f'Cannot place a piece in column "{move}"')
@@ -171,71 +405,270 @@ class ConnectFourGame:
         """Return the number of rows of the board."""
         return self._rows
 
+    def get_connect(self) -> int:
+        """Return the number of pieces in a row needed to win this game."""
+        return self._connect
+
+    def get_evaluation(self, piece: int) -> int:
+        """Return the heuristic score of the board from the perspective of the player with the
+        given piece (see evaluation.py). The score is kept up to date after every move, so this
+        does not need to look at the board.
+
+        Preconditions:
+            - piece in {RED_PIECE, YELLOW_PIECE}
+
+        >>> game = ConnectFourGame()
+        >>> for move in [3, 0, 4]:
+        ...     game.make_move(move)
+        >>> game.get_evaluation(RED_PIECE)
+        9
+        >>> game.get_evaluation(YELLOW_PIECE)
+        0
+        """
+        return self._evaluations[piece - 1]
+
+    def get_moves_made(self) -> int:
+        """Return the number of moves that have been made in this game."""
+        return self._moves_made
+
+    def get_move_history(self) -> list[int]:
+        """Return the columns of the moves that have been made in this game, in the order they
+        were made.
+
+        >>> game = ConnectFourGame()
+        >>> game.make_move(3)
+        >>> game.make_move(0)
+        >>> game.get_move_history()
+        [3, 0]
+        """
+        return self._moves.copy()
+
+    def get_max_moves(self) -> int:
+        """Return the maximum number of moves that can be made in this game before it must be
+        over."""
+        return self._max_moves
+
     def get_board(self) -> np.ndarray:
-        """Return an array representation of the current state of the game board."""
-        return np.flip(self._board, 0)
+        """Return an array representation of the current state of the game board. The array is
+        a new array of floats, where the first row is the top row of the board.
+
+        Use get_cells instead to read the board without creating a new array.
+        """
+        board = np.frombuffer(self._board, dtype=np.int8).reshape(self._rows, self._cols)
+        return np.flip(board, 0).astype(float)
+
+    def get_cells(self) -> memoryview:
+        """Return a read-only view of the cells of the board, which holds one byte per cell: the
+        piece in that cell, or EMPTY_PIECE. The cell at (row, col) is at index
+        row * self.get_cols() + col, where row 0 is the bottom row of the board (unlike the array
+        returned by get_board, whose first row is the top row).
+
+        The view is not a copy of the board. It always shows the current state of the board, so it
+        can be kept and read after later moves. (The view is created by each call rather than kept
+        by the game, since a memoryview cannot be copied with copy.deepcopy or pickled.)
+
+        >>> game = ConnectFourGame()
+        >>> cells = game.get_cells()
+        >>> game.make_move(3)
+        >>> game.make_move(3)
+        >>> (cells[3], cells[7 + 3], len(cells))
+        (1, 2, 42)
+        >>> cells[0] = RED_PIECE
+        Traceback (most recent call last):
+        TypeError: cannot modify read-only memory
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(game)).get_cells() == cells
+        True
+        """
+        return memoryview(self._board).toreadonly()
 
     def is_red_move(self) -> bool:
         """Return whether it is red's move or not."""
         return self._red_move
 
-    def _get_row_for_move(self, col: int) -> int:
-        """Return the row that a piece should be placed on when dropped into the column <col>.
+    def get_hash(self) -> int:
+        """Return a 64-bit hash of the current state of the game.
+
+        Game states with the same board and the same current player have the same hash, no matter
+        what order the moves were made in.
+
+        >>> game1 = ConnectFourGame()
+        >>> for move in [3, 4, 2]:
+        ...     game1.make_move(move)
+        >>> game2 = ConnectFourGame()
+        >>> for move in [2, 4, 3]:
+        ...     game2.make_move(move)
+        >>> game1.get_hash() == game2.get_hash()
+        True
+        >>> game1.get_hash() == ConnectFourGame(red_move=False).copy_and_make_move(3).get_hash()
+        False
+        """
+        return self._hash
+
+    def get_mirror_hash(self) -> int:
+        """Return the hash (see get_hash) of the current state of the game with its board mirrored
+        from left to right.
+
+        A game state and its mirror image are equally good for the current player, with every
+        move mirrored, so the smaller of the two hashes can be used to identify both of them (see
+        get_canonical_hash).
+
+        >>> game1 = ConnectFourGame()
+        >>> game1.make_move(0)
+        >>> game2 = ConnectFourGame()
+        >>> game2.make_move(6)
+        >>> game1.get_mirror_hash() == game2.get_hash()
+        True
+        >>> game1.make_move(3)
+        >>> game1.get_mirror_hash() == game1.get_hash()
+        False
+        """
+        return self._mirror_hash
+
+    def get_canonical_hash(self) -> int:
+        """Return the smaller of the hash of the current state of the game and the hash of its
+        mirror image, which is the same for a game state and its mirror image.
+
+        A move in the game state whose hash is the canonical hash is mirrored (i.e., column
+        <col> becomes column self.get_cols() - 1 - <col>) in the other game state.
+
+        >>> game1 = ConnectFourGame()
+        >>> game1.make_move(1)
+        >>> game2 = ConnectFourGame()
+        >>> game2.make_move(5)
+        >>> game1.get_canonical_hash() == game2.get_canonical_hash()
+        True
+        """
+        return min(self._hash, self._mirror_hash)
+
+    def is_symmetric(self) -> bool:
+        """Return whether the board is the same as its mirror image, in which case every move
+        leads to a game state that is as good for the current player as its mirrored move does.
+
+        >>> game = ConnectFourGame()
+        >>> game.make_move(3)
+        >>> game.is_symmetric()
+        True
+        >>> game.make_move(2)
+        >>> game.is_symmetric()
+        False
+        >>> game.make_move(4)
+        >>> game.is_symmetric()
+        False
+        """
+        # Comparing the hashes first skips the board for nearly every game state that is not
+        # symmetric
+        if self._hash != self._mirror_hash:
+            return False
+        rows = [self._board[start:start + self._cols]
+                for start in range(0, len(self._board), self._cols)]
+        return all(row == row[::-1] for row in rows)
+
+    def _copy_state_to(self, new_game: ConnectFourGame) -> None:
+        """Copy the state of this game that is stored the same way by every kind of game into
+        <new_game>, which has no state yet. The state that is never changed after it is created
+        is shared rather than copied.
+        """
+        new_game._rows, new_game._cols, new_game._connect = self._rows, self._cols, self._connect
+        new_game._board = self._board.copy()
+        new_game._position, new_game._mask = self._position, self._mask
+        new_game._win_shifts = self._win_shifts
+        new_game._heights = self._heights.copy()
+        new_game._valid_moves = self._valid_moves
+        new_game._red_move = self._red_move
+        new_game._moves_made = self._moves_made
+        new_game._moves = self._moves.copy()
+        new_game._max_moves = self._max_moves
+        new_game._winner = self._winner
+        new_game._hash, new_game._mirror_hash = self._hash, self._mirror_hash
+        new_game._zobrist_keys, new_game._red_move_key = self._zobrist_keys, self._red_move_key
+        new_game._window_counts = [counts.copy() for counts in self._window_counts]
+        new_game._cell_windows, new_game._window_scores = self._cell_windows, self._window_scores
+        new_game._evaluations = self._evaluations.copy()
+
+    def _update_winner(self, row: int, col: int) -> None:
+        """Update self._winner after a piece was placed at (<row>, <col>) by the previous player.
 
         Preconditions:
-            - self.is_valid_move(col)
-        """
-        # Find the first row with a 0 (no piece) and return it
-        for row in range(0, self._rows):
-            if self._board[row][col] == 0:
-                return row
-        # The move is valid, so we cannot reach this line of code
-        assert False
-
-    def _is_winner(self) -> bool:
-        """Return whether or not the previous move made was a winning move."""
-        # Check the move made by the previous player
-        piece = RED_PIECE if not self._red_move else YELLOW_PIECE
-
-        # Check for horizontal four in a rows
-        for col in range(0, self._cols - 3):
-            for row in range(0, self._rows):
-                # Check if we have a four in a row
-                if all(self._board[row][col + i] == piece for i in range(0, 4)):
-                    return True
+            - 0 <= row <= self.get_rows() - 1
+            - 0 <= col <= self.get_cols() - 1
+            - the game was not over before the piece at (<row>, <col>) was placed
+        """
+        if self._moves_made >= self._max_moves:
+            self._winner = 'Draw'
+        elif self._is_winning_move(row, col):
+            self._winner = 'Yellow' if self._red_move else 'Red'
+        else:
+            self._winner = None
 
-        # Check for vertical four in a rows
-        for col in range(0, self._cols):
-            for row in range(0, self._rows - 3):
-                # Check if we have a four in a row
-                if all(self._board[row + i][col] == piece for i in range(0, 4)):
-                    return True
+    def _is_winning_move(self, row: int, col: int) -> bool:
+        """Return whether or not the piece at (<row>, <col>) is part of a four in a row (or
+        however many pieces in a row are needed to win).
 
-        # Check for diagonal four in rows that look like: "/"
-        for col in range(0, self._cols - 3):
-            for row in range(0, self._rows - 3):
-                # Check if we have a four in a row
-                if all(self._board[row + i][col + i] == piece for i in range(0, 4)):
-                    return True
+        Checking every line of the previous player's pieces at once costs the same handful of
+        integer operations as checking only the lines through (<row>, <col>), so the position
+        of the piece is not needed.
 
-        # Check for diagonal four in a rows that look like: "\"
-        for col in range(0, self._cols - 3):
-            for row in range(3, self._rows):
-                # Check if we have a four in a row
-                if all(self._board[row - i][col + i] == piece for i in range(0, 4)):
+        Preconditions:
+            - 0 <= row <= self.get_rows() - 1
+            - 0 <= col <= self.get_cols() - 1
+            - the piece at (<row>, <col>) was placed by the previous player
+        """
+        # The pieces of the player who made the previous move
+        pieces = self._position ^ self._mask
+
+        # Vertical, horizontal, "\" diagonal and "/" diagonal neighbours respectively
+        if self._connect == 4:
+            # The shifts for four in a row are always a shift and double that shift
+            for shift, double_shift in self._win_shifts:
+                pairs = pieces & (pieces >> shift)
+                if pairs & (pairs >> double_shift):
                     return True
+            return False
+
+        for steps in self._win_shifts:
+            lines = pieces
+            for step in steps:
+                lines &= lines >> step
+            if lines:
+                return True
 
-        # If we have not yet returned a value, the previous move was not a winning move
+        # If we have not yet returned a value, the piece is not part of a four in a row
         return False
 
-    def _calculate_valid_moves(self) -> None:
-        """Update self._valid_moves so that it contains the valid moves of current state of
-        the game."""
-        valid_moves = []
-        for col in range(0, self._cols):
-            if self.is_valid_move(col):
-                valid_moves.append(col)
-        self._valid_moves = valid_moves
+    def _update_evaluations(self, row: int, col: int, piece: int, change: int) -> None:
+        """Update self._window_counts and self._evaluations after <piece> is placed at
+        (<row>, <col>) (if <change> is 1), or removed from (<row>, <col>) (if <change> is -1).
+
+        Only the windows that contain (<row>, <col>) can have changed, so only their scores
+        are recalculated.
+
+        Preconditions:
+            - 0 <= row <= self.get_rows() - 1
+            - 0 <= col <= self.get_cols() - 1
+            - piece in {RED_PIECE, YELLOW_PIECE}
+            - change in {1, -1}
+        """
+        # The counts and evaluations of <piece> are at index piece - 1, and those of the other
+        # piece are at the other index
+        own_counts = self._window_counts[piece - 1]
+        opponent_counts = self._window_counts[2 - piece]
+
+        window_scores = self._window_scores
+        own_change, opponent_change = 0, 0
+        for window in self._cell_windows[row][col]:
+            own, opponent = own_counts[window], opponent_counts[window]
+            new_own = own + change
+            own_change += window_scores[new_own][opponent] - window_scores[own][opponent]
+            opponent_change += window_scores[opponent][new_own] - window_scores[opponent][own]
+            own_counts[window] = new_own
+
+        # Centre pieces are worth more (more opportunities can be created from centre pieces)
+        if col == self._cols // 2:
+            own_change += change * CENTRE_PIECE_WORTH
+
+        self._evaluations[piece - 1] += own_change
+        self._evaluations[2 - piece] += opponent_change
 
 
 if __name__ == '__main__':
@@ -245,7 +678,8 @@ if __name__ == '__main__':
     python_ta.contracts.check_all_contracts()
 
     python_ta.check_all(config={
-        'extra-imports': ['python_ta.contracts', 'numpy', 'pygame', 'copy'],
+        'extra-imports': ['python_ta.contracts', 'numpy', 'pygame', 'random',
+                          'evaluation'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['E1136', 'R1710']
@@ -0,0 +1,247 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Board Evaluation
+
+Module Description
+===============================
+This Python module contains the heuristic that the minimax algorithm uses to score game states
+that are not over (i.e., how favourable a board is for a player), along with the tables that allow
+this score to be kept up to date as moves are made, rather than recalculated from scratch.
+
+A board is scored by looking at every "window" of four cells in a row (horizontally, vertically or
+diagonally). Each window is scored based only on how many of its cells contain the player's pieces
+and how many contain the opponent's pieces, so when a piece is dropped into the board, only the
+scores of the windows containing that piece change.
+
+In games where a different number of pieces in a row is needed to win (e.g., connect five), the
+windows are that many cells long instead, and a window that is one piece (or two pieces) short of
+a win is scored as a three (or two) in a row is.
+
+Boards can also be scored many at a time with evaluate_boards, which looks up the score of every
+window of every board at once using numpy rather than looping over them in Python.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+import numpy as np
+
+# Global constants
+FOUR_IN_A_ROW_SCORE = 10000000000
+THREE_IN_A_ROW_SCORE = 5
+TWO_IN_A_ROW_SCORE = 2
+CENTRE_PIECE_WORTH = 3
+
+OPPONENT_FOUR_IN_A_ROW_SCORE = -10000000000
+OPPONENT_THREE_IN_A_ROW_SCORE = -4
+
+WINDOW_LENGTH = 4
+
+
+def score_window(own: int, opponent: int, length: int = WINDOW_LENGTH) -> int:
+    """Return the score of a window of <length> cells that contains <own> of a player's pieces and
+    <opponent> of their opponent's pieces, from the perspective of that player.
+
+    Preconditions:
+        - length >= 2
+        - 0 <= own <= length
+        - 0 <= opponent <= length
+        - own + opponent <= length
+
+    >>> score_window(3, 0)
+    5
+    >>> score_window(3, 1)
+    0
+    >>> score_window(0, 3)
+    -4
+    >>> score_window(4, 0, length=5)
+    5
+    """
+    score = 0
+    empty = length - own - opponent
+
+    # Note: Three in a rows and two in a rows are weighted MUCH less than four in a rows because:
+    #   1. Four in a rows with empty columns beside them can also produce subsequent three AND
+    #      two in a rows when different windows of the board are scored (i.e., a window only
+    #      containing 3 of the pieces of the four in a row and also an empty spot will be scored
+    #      as a three in a row as well). This is intentional! It allows the player to detect
+    #      'forks' (positions that, no matter what piece a player plays, the other player receives
+    #      an advantage either way; a 'forcing move' in a sense).
+    #   2. When playing at a certain depth, most base cases in the minimax algorithm will find
+    #      four in a rows, so three and two in a rows become more irrelevant.
+
+    # Four in a row
+    if own == length:
+        score += FOUR_IN_A_ROW_SCORE
+    # Three in a row
+    elif own == length - 1 and empty == 1:
+        score += THREE_IN_A_ROW_SCORE
+    # Two in a row
+    elif own == length - 2 and empty == 2:
+        score += TWO_IN_A_ROW_SCORE
+
+    # Opponent four in a row
+    if opponent == length:
+        score += OPPONENT_FOUR_IN_A_ROW_SCORE
+    # Opponent three in a row
+    elif opponent == length - 1 and empty == 1:
+        score += OPPONENT_THREE_IN_A_ROW_SCORE
+    # Note: After extensive testing, opponent two in a rows were removed, as they
+    # did not contribute much (their heuristic value was -1, which is almost
+    # nothing).
+
+    return score
+
+
+def generate_windows(rows: int, cols: int,
+                     length: int = WINDOW_LENGTH) -> list[tuple[tuple[int, int], ...]]:
+    """Return every window of <length> cells in a row on a board with <rows> rows and <cols>
+    columns. Each window is a tuple of the (row, col) positions of its cells, where row 0 is the
+    bottom row of the board.
+
+    >>> windows = generate_windows(6, 7)
+    >>> len(windows)
+    69
+    >>> windows[0]
+    ((0, 0), (0, 1), (0, 2), (0, 3))
+    >>> len(generate_windows(7, 9, length=5))
+    92
+    """
+    windows = []
+    # Horizontal, vertical, "/" diagonal and "\" diagonal directions respectively
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+        for row in range(0, rows):
+            for col in range(0, cols):
+                end_row = row + (length - 1) * d_row
+                end_col = col + (length - 1) * d_col
+                if 0 <= end_row < rows and end_col < cols:
+                    windows.append(tuple((row + i * d_row, col + i * d_col)
+                                         for i in range(0, length)))
+    return windows
+
+
+def generate_cell_windows(rows: int, cols: int,
+                          windows: list[tuple[tuple[int, int], ...]]) -> list[list[list[int]]]:
+    """Return a list where the element at [row][col] is a list of the indexes of each window in
+    <windows> that contains the cell (row, col) of a board with <rows> rows and <cols> columns.
+
+    >>> cell_windows = generate_cell_windows(6, 7, generate_windows(6, 7))
+    >>> len(cell_windows[0][0])
+    3
+    >>> len(cell_windows[2][3])
+    13
+    """
+    cell_windows = [[[] for _ in range(0, cols)] for _ in range(0, rows)]
+    for i, window in enumerate(windows):
+        for row, col in window:
+            cell_windows[row][col].append(i)
+    return cell_windows
+
+
+def generate_window_scores(length: int) -> list[list[int]]:
+    """Return a list where the element at [own][opponent] is score_window(own, opponent, length),
+    or 0 if a window of <length> cells cannot contain that many pieces.
+
+    Preconditions:
+        - length >= 2
+
+    >>> generate_window_scores(4)[3][0]
+    5
+    """
+    return [[score_window(own, opponent, length) if own + opponent <= length else 0
+             for opponent in range(0, length + 1)]
+            for own in range(0, length + 1)]
+
+
+# The tables calculated by _get_batch_tables, keyed by the board size and window length they are
+# for
+_BATCH_TABLES = {}
+
+
+def evaluate_boards(boards: np.ndarray, piece: int, rows: int = 6, cols: int = 7,
+                    length: int = WINDOW_LENGTH) -> np.ndarray:
+    """Return an array containing the heuristic score of each board in <boards>, from the
+    perspective of the player with <piece>, in a game where <length> pieces in a row are needed
+    to win. Boards with no empty cells (draws) have a score of 0.
+
+    <boards> is an array of shape (N, <rows>, <cols>) of boards in the same form as returned by
+    ConnectFourGame.get_board, or an array of shape (N, <rows> * <cols>) of those boards
+    flattened. Empty cells must be 0, and every other piece is treated as the opponent's.
+    Turning a board upside down does not change its score, so the rows can also be in the
+    opposite order (e.g., the cells of a game as returned by ConnectFourGame.get_cells).
+
+    The scores are the same as the ones kept by each ConnectFourGame (see
+    ConnectFourGame.get_evaluation), but are calculated for every window of every board in a
+    single numpy operation.
+
+    Preconditions:
+        - piece != 0
+        - boards.shape[1:] in {(rows, cols), (rows * cols,)}
+        - length >= 2
+
+    >>> empty = np.zeros((6, 7))
+    >>> centre = empty.copy()
+    >>> centre[5, 3] = 1
+    >>> three = centre.copy()
+    >>> three[5, 1:3] = 1
+    >>> evaluate_boards(np.array([empty, centre, three]), 1)
+    array([ 0,  3, 15])
+    >>> evaluate_boards(np.array([empty, centre, three]).reshape(3, 42), 2)
+    array([ 0,  0, -8])
+    >>> evaluate_boards(np.array([np.flip(three, 0)]), 1)
+    array([15])
+    """
+    cells = np.asarray(boards).reshape(len(boards), rows * cols)
+    window_indexes, code_scores = _get_batch_tables(rows, cols, length)
+
+    # Describe the contents of each window as a base 3 number, with one digit for each cell
+    # (0 for empty, 1 for <piece> and 2 for any other piece)
+    digits = np.where(cells == piece, 1, np.where(cells == 0, 0, 2))
+    codes = digits[:, window_indexes] @ (3 ** np.arange(length - 1, -1, -1))
+
+    scores = code_scores[codes].sum(axis=1)
+    scores += CENTRE_PIECE_WORTH * (digits[:, cols // 2::cols] == 1).sum(axis=1)
+
+    # Assign a score of 0 to boards that end in a draw
+    scores[(digits != 0).all(axis=1)] = 0
+    return scores
+
+
+def _get_batch_tables(rows: int, cols: int, length: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the tables used by evaluate_boards to score a board with <rows> rows and <cols>
+    columns where <length> pieces in a row are needed to win, in the form
+    (window_indexes, code_scores).
+
+    window_indexes is an array of shape (number of windows, <length>) of the index of each cell of
+    each window in a flattened board. code_scores is an array that maps the base 3 number
+    describing the contents of a window (see evaluate_boards) to the score of that window, from
+    the perspective of the player whose pieces are the 1 digits. Both tables are only calculated
+    once for each board size and length.
+    """
+    if (rows, cols, length) not in _BATCH_TABLES:
+        # Cells are indexed in the same form as ConnectFourGame.get_board (top row first)
+        windows = generate_windows(rows, cols, length)
+        window_indexes = np.array([[(rows - 1 - row) * cols + col for row, col in window]
+                                   for window in windows], dtype=np.int64).reshape(-1, length)
+        code_scores = np.zeros(3 ** length, dtype=np.int64)
+        for code in range(0, 3 ** length):
+            window = np.base_repr(code, 3).zfill(length)
+            code_scores[code] = score_window(window.count('1'), window.count('2'), length)
+        _BATCH_TABLES[(rows, cols, length)] = (window_indexes, code_scores)
+
+    return _BATCH_TABLES[(rows, cols, length)]
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'numpy'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
@@ -12,19 +12,32 @@ This file is Copyright (c) 2021 Anis Singh.
 """
 from __future__ import annotations
 import math
-from typing import Union, Optional
-from connect_four import ConnectFourGame, EMPTY_PIECE, RED_PIECE, YELLOW_PIECE
+import time
+from typing import Any, Union, Optional
+from connect_four import ConnectFourGame, RED_PIECE, YELLOW_PIECE
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from move_ordering import MoveOrdering
+from search_stats import SearchStats
+from tree_arena import TreeArena, ROOT
 
 # Global constants
 ROOT_MOVE = 255
 
-FOUR_IN_A_ROW_SCORE = 10000000000
-THREE_IN_A_ROW_SCORE = 5
-TWO_IN_A_ROW_SCORE = 2
-CENTRE_PIECE_WORTH = 3
+# The search algorithms of the in-place minimax algorithm (see GameTree.minimax)
+ALPHA_BETA = 'alpha-beta'
+PVS = 'pvs'
 
-OPPONENT_FOUR_IN_A_ROW_SCORE = -10000000000
-OPPONENT_THREE_IN_A_ROW_SCORE = -4
+# How far above or below the expected score the alpha-beta window of a search with an aspiration
+# window starts (see GameTree.minimax)
+ASPIRATION_WINDOW = 8
+
+
+class SearchTimeout(Exception):
+    """Exception raised when the minimax algorithm runs past its deadline, or is told to stop."""
+
+    def __str__(self) -> str:
+        """Return a string representation of this error."""
+        return 'The minimax algorithm was stopped before it finished'
 
 
 class GameTree:
@@ -58,8 +71,45 @@ class GameTree:
     #           or an integer if the score has been evaluated. Initialized to None until
     #           it gets calculated. Can be a float as well because, in the minimax algorithm,
     #           it gets assigned to math.inf or -math.inf, which is a float.
+    #  -_table: the transposition table used by the minimax algorithm, or None if no
+    #           transposition table is used
+    #  -_deadline: the time (as returned by time.monotonic) that the in-place minimax
+    #              algorithm must finish by, or None if it has no deadline
+    #  -_stop: an event that stops the in-place minimax algorithm once it is set, or None if
+    #          it can only be stopped by its deadline
+    #  -_ordering: the order the in-place minimax algorithm searches moves in, or None if moves
+    #              are searched from the leftmost column to the rightmost column
+    #  -_root_depth: the depth that the in-place minimax algorithm was called with on self
+    #  -_stats: the statistics of the most recent search from self, or None if self has not been
+    #           searched from
+    #  -_fold_mirrors: whether the in-place minimax algorithm stores each game state and its mirror
+    #                  image under the same transposition table entry (see _can_fold_mirrors)
+    #  -_root_moves: the moves the in-place minimax algorithm searches from self.game_state (see
+    #                get_distinct_moves)
+    #  -_arena: the arena that the in-place minimax algorithm adds each game state it searches to,
+    #           or None if the game states searched are not kept
+    #  -_arena_node: the node of self._arena for the game state that the in-place minimax
+    #                algorithm is about to search
+    #  -_pvs: whether the in-place minimax algorithm uses principal variation search
+    #
+    # A retained tree has one GameTree for every game state it explores, so instances use
+    # __slots__ rather than a __dict__.
+    __slots__ = ('game_state', 'move', 'player', '_subtrees', '_score', '_table', '_deadline',
+                 '_stop', '_ordering', '_root_depth', '_stats', '_fold_mirrors', '_root_moves',
+                 '_arena', '_arena_node', '_pvs')
     _subtrees: list[GameTree]
     _score: Optional[Union[int, float]]
+    _table: Optional[TranspositionTable]
+    _deadline: Optional[float]
+    _stop: Optional[Any]
+    _ordering: Optional[MoveOrdering]
+    _root_depth: int
+    _stats: Optional[SearchStats]
+    _fold_mirrors: bool
+    _root_moves: list[int]
+    _arena: Optional[TreeArena]
+    _arena_node: int
+    _pvs: bool
 
     def __init__(self, player: str, move: int = ROOT_MOVE,
                  game_state: ConnectFourGame = ConnectFourGame()) -> None:
@@ -69,6 +119,17 @@ class GameTree:
         self.move = move
         self._score = None
         self._subtrees = []
+        self._table = None
+        self._deadline = None
+        self._stop = None
+        self._ordering = None
+        self._root_depth = 0
+        self._stats = None
+        self._fold_mirrors = False
+        self._root_moves = []
+        self._arena = None
+        self._arena_node = ROOT
+        self._pvs = False
 
     def get_subtrees(self) -> list[GameTree]:
         """Return the subtrees of this game tree."""
@@ -86,16 +147,68 @@ class GameTree:
         # certain game state yet (this is highly unlikely!)
         return self.game_state.get_winner() is not None
 
-    def minimax(self, d: int) -> int:
+    def minimax(self, d: int, retain_tree: bool = False,
+                table: Optional[TranspositionTable] = None, first_move: Optional[int] = None,
+                deadline: Optional[float] = None, ordering: Optional[MoveOrdering] = None,
+                stop: Optional[Any] = None, arena: Optional[TreeArena] = None,
+                algorithm: str = ALPHA_BETA,
+                aspiration: Optional[Union[int, float]] = None) -> int:
         """Apply the minimax algorithm with alpha beta pruning to self up until depth <d> to
-        determine the appropriate move to choose. Mutates self by extending this game tree to
-        depth <= <d> by adding future game states. Returns the move that should be chosen.
+        determine the appropriate move to choose. Returns the move that should be chosen.
+
+        The future game states are explored by making and undoing moves in self.game_state, and
+        each game state's score and best move are passed back up to the game state before it, so
+        no copies of the game are created and no subtrees are added to self. self.game_state is
+        restored to its original state before this method returns.
+
+        The results of searching each game state are stored in <table> (if it is not None), and
+        game states that are already in <table> are not searched again. <table> can be reused by
+        later calls to this method, as long as they are from the perspective of the same player.
+        <first_move> (if it is not None) is the first move searched from self.game_state, and the
+        other moves are searched in the order given by <ordering> (which learns from the cutoffs
+        of this search), or from left to right if <ordering> is None. A SearchTimeout is raised
+        if the search is still running at time <deadline> (as returned by time.monotonic), in
+        which case self.game_state is still restored. A SearchTimeout is also raised once <stop>
+        (an event such as a threading.Event or multiprocessing.Event) is set, if it is not None.
+
+        If <arena> is not None, every game state searched is added to <arena> as a child of the
+        game state it was searched from, along with the score the search found for it (which is
+        only a bound if the search of the game state was cut off). A game state that is searched
+        again (by principal variation search or after an aspiration window fails) only keeps the
+        game states of its last search. This keeps the game tree
+        that was searched in far less memory than <retain_tree> does.
+
+        <algorithm> is the way the moves of each game state are searched:
+            - ALPHA_BETA: every move is searched with the alpha-beta window of the game state
+            - PVS: principal variation search. The first move is searched with the alpha-beta
+                   window of the game state, and every other move is first searched with a
+                   null window, which only proves whether it is better than the best move so far
+                   (see _search_null_window).
+
+        If <aspiration> is not None, it is the score that self.game_state is expected to have
+        (e.g., the score found by a search to depth <d> - 1), and the search starts with an
+        aspiration window: the alpha-beta window (<aspiration> - ASPIRATION_WINDOW,
+        <aspiration> + ASPIRATION_WINDOW) instead of (-inf, inf). The narrower window leads to
+        more cutoffs, but if the score is outside of it, self.game_state is searched again with
+        the full window.
+
+        A game state and its mirror image (its board flipped from left to right) have the same
+        score, so on boards with an odd number of columns, they share an entry of <table>, and
+        if the board of self.game_state is symmetric, only the moves in the left half of the
+        board (including the centre column) are searched from it.
+
+        If <retain_tree> is True, self is instead mutated by extending this game tree to
+        depth <= <d> by adding future game states, each with its own copy of the game. This uses
+        far more memory, and is only meant for debugging and visualizing the search. The other
+        arguments are ignored in this mode.
 
         Preconditions:
             - d > 0
             - the player calling this method is the player who's turn it is in the game
             - this method has not previously been called on self
             - there is at least one valid move in self.game_state
+            - arena is None or arena only contains the root node, which has the same game state
+              as self.game_state
 
         >>> game = ConnectFourGame()
         >>> game.is_red_move()
@@ -105,16 +218,227 @@ class GameTree:
         >>> # depth 2
         >>> tree.minimax(d=2)
         3
+        >>> tree.get_subtrees()
+        []
+        >>> game.get_valid_moves()
+        [0, 1, 2, 3, 4, 5, 6]
+        >>> tree = GameTree(player='Red', move=ROOT_MOVE, game_state=game)
+        >>> tree.minimax(d=2, retain_tree=True)
+        3
+        >>> [subtree.move for subtree in tree.get_subtrees()]
+        [0, 1, 2, 3, 4, 5, 6]
+        >>> table = TranspositionTable(size=1024)
+        >>> GameTree(player='Red', game_state=game).minimax(d=2, table=table)
+        3
+        >>> try:
+        ...     GameTree(player='Red', game_state=game).minimax(d=2, deadline=0.0)
+        ... except SearchTimeout:
+        ...     print('The search did not finish in time')
+        The search did not finish in time
+        >>> GameTree(player='Red', game_state=game).minimax(d=2, ordering=MoveOrdering())
+        3
+        >>> arena = TreeArena(game)
+        >>> tree = GameTree(player='Red', game_state=game)
+        >>> tree.minimax(d=2, arena=arena)
+        3
+        >>> arena.get_size() == tree.get_nodes_searched()
+        True
+        >>> [arena.get_move(node) for node in arena.get_children(ROOT)]
+        [0, 1, 2, 3]
+        >>> arena.get_score(ROOT)
+        3.0
+        >>> arena = TreeArena(game)
+        >>> tree = GameTree(player='Red', game_state=game)
+        >>> tree.minimax(d=4, ordering=MoveOrdering(), arena=arena, algorithm=PVS, aspiration=-20)
+        3
+        >>> tree.get_score()
+        6
+        >>> sorted(arena.get_move(node) for node in arena.get_children(ROOT))
+        [0, 1, 2, 3]
+        """
+        if retain_tree:
+            self._stats = SearchStats()
+            self._minimax(d, -math.inf, math.inf, True)
+            self._stats.nodes = self._count_game_states()
+            # Note: The below line is why we have the precondition d > 0. If d = 0, this line
+            # would return None, and a player cannot play the move None.
+            return self._find_move_by_score()
+
+        self._table, self._deadline, self._ordering = table, deadline, ordering
+        self._stop = stop
+        self._root_depth = d
+        self._fold_mirrors = _can_fold_mirrors(self.game_state)
+        self._root_moves = get_distinct_moves(self.game_state)
+        self._arena, self._arena_node = arena, ROOT
+        self._pvs = algorithm == PVS
+
+        if aspiration is None:
+            self._score, move = self._timed_search(d, -math.inf, math.inf, True, first_move)
+        else:
+            alpha, beta = aspiration - ASPIRATION_WINDOW, aspiration + ASPIRATION_WINDOW
+            size = 0 if arena is None else arena.get_size()
+            self._score, move = self._timed_search(d, alpha, beta, True, first_move)
+            if not alpha < self._score < beta:
+                # The score is only a bound, so the move may not be the best one. The statistics
+                # of both searches are kept, but only the game states of the second search are
+                # kept in the arena.
+                if arena is not None:
+                    arena.truncate(size)
+                self._arena_node = ROOT
+                stats = self._stats
+                try:
+                    self._score, move = self._timed_search(d, -math.inf, math.inf, True, move)
+                finally:
+                    stats.add(self._stats)
+                    self._stats = stats
+
+        if arena is not None:
+            arena.set_score(ROOT, self._score)
+        return move
+
+    def minimax_score(self, d: int, alpha: Union[float, int] = -math.inf,
+                      beta: Union[float, int] = math.inf, maximizing_player: bool = True,
+                      table: Optional[TranspositionTable] = None,
+                      deadline: Optional[float] = None,
+                      ordering: Optional[MoveOrdering] = None,
+                      stop: Optional[Any] = None,
+                      algorithm: str = ALPHA_BETA) -> Union[int, float]:
+        """Apply the minimax algorithm with alpha beta pruning to self up until depth <d> in the
+        same way as the minimax method, but return the score of self.game_state (from the
+        perspective of self.player) instead of a move.
+
+        Unlike the minimax method, the search starts with the alpha-beta window
+        (<alpha>, <beta>), and self.game_state does not need to be the player's turn:
+        <maximizing_player> is whether it is self.player's turn in self.game_state. If the score
+        returned is <= <alpha>, it is only an upper bound on the score of self.game_state, and if
+        it is >= <beta>, it is only a lower bound.
+
+        Preconditions:
+            - d >= 0
+            - alpha < beta
+
+        >>> game = ConnectFourGame()
+        >>> game.make_move(3)
+        >>> tree = GameTree(player='Red', move=3, game_state=game)
+        >>> tree.minimax_score(1, maximizing_player=False)
+        3
+        """
+        self._table, self._deadline, self._ordering = table, deadline, ordering
+        self._stop = stop
+        self._root_depth = d
+        self._fold_mirrors = _can_fold_mirrors(self.game_state)
+        self._root_moves = get_distinct_moves(self.game_state)
+        self._arena = None
+        self._pvs = algorithm == PVS
+        self._score, _ = self._timed_search(d, alpha, beta, maximizing_player)
+        return self._score
+
+    def get_score(self) -> Optional[Union[int, float]]:
+        """Return the score of self.game_state (from the perspective of self.player) found by the
+        most recent call to minimax or minimax_score on self, or None if neither has been called.
+        """
+        return self._score
+
+    def get_nodes_searched(self) -> int:
+        """Return the number of game states (including self.game_state) searched by the most
+        recent call to minimax or minimax_score on self, or 0 if neither has been called.
+
+        >>> tree = GameTree(player='Red', game_state=ConnectFourGame())
+        >>> tree.minimax(d=1)
+        3
+        >>> tree.get_nodes_searched()
+        5
+        """
+        return 0 if self._stats is None else self._stats.nodes
+
+    def get_stats(self) -> SearchStats:
+        """Return the statistics of the most recent call to minimax or minimax_score on self
+        (see search_stats.py). Only the number of game states searched is recorded when the
+        minimax method is called with <retain_tree> set to True.
+
+        If the search raised a SearchTimeout, the statistics cover the part of the search that
+        finished.
+
+        >>> tree = GameTree(player='Red', game_state=ConnectFourGame())
+        >>> tree.minimax(d=2)
+        3
+        >>> stats = tree.get_stats()
+        >>> stats.nodes, stats.leaves, stats.nodes_per_ply
+        (21, 16, [1, 4, 16])
+        >>> stats.cutoffs, stats.first_move_cutoffs
+        (2, 2)
+        """
+        return SearchStats() if self._stats is None else self._stats
+
+    def get_principal_variation(self, max_length: int) -> list[int]:
+        """Return the principal variation of the most recent call to minimax on self: the
+        sequence of moves (starting with the move chosen for self.game_state) that both players
+        make if they play the best moves found by the search, up to <max_length> moves long.
+
+        The principal variation is read from the transposition table used by the search, by
+        following the best move stored for each game state, so it is empty if no table was used,
+        and it stops early at a game state that is over or whose entry has been replaced.
+
+        Preconditions:
+            - max_length >= 0
+            - the minimax method has been called on self with <retain_tree> set to False
+
+        >>> game = ConnectFourGame()
+        >>> tree = GameTree(player='Red', game_state=game)
+        >>> tree.minimax(d=3, table=TranspositionTable(size=1024))
+        3
+        >>> tree.get_principal_variation(3)
+        [3, 1, 3]
+        >>> game.get_moves_made()
+        0
         """
-        self._minimax(d, -math.inf, math.inf, True)
-        # Note: The below line is why we have the precondition d > 0. If d = 0, this line would
-        # return None, and a player cannot play the move None.
-        return self._find_move_by_score()
+        if self._table is None:
+            return []
+
+        game = self.game_state
+        moves = []
+        try:
+            while len(moves) < max_length and game.get_winner() is None:
+                key, mirrored = self._get_table_key()
+                entry = self._table.probe(key)
+                if entry is None or entry[3] is None:
+                    break
+                move = game.get_cols() - 1 - entry[3] if mirrored else entry[3]
+                if not game.is_valid_move(move):
+                    break
+                moves.append(move)
+                game.make_move(move)
+        finally:
+            for _ in moves:
+                game.undo_move()
+
+        return moves
+
+    def _timed_search(self, d: int, alpha: Union[float, int], beta: Union[float, int],
+                      maximizing_player: bool, first_move: Optional[int] = None) \
+            -> tuple[Union[int, float], Optional[int]]:
+        """Call the _minimax_in_place method with the given arguments, recording the statistics
+        of the search (including the time it took, even if it raises a SearchTimeout) in
+        self._stats.
+
+        Preconditions:
+            - d >= 0
+        """
+        self._stats = SearchStats(d)
+        start = time.perf_counter()
+        try:
+            return self._minimax_in_place(d, alpha, beta, maximizing_player, first_move)
+        finally:
+            self._stats.iteration_times.append(time.perf_counter() - start)
+
+    def _count_game_states(self) -> int:
+        """Return the number of game states in this game tree."""
+        return 1 + sum(subtree._count_game_states() for subtree in self._subtrees)
 
     def _minimax(self, d: int, alpha: Union[float, int], beta: Union[float, int],
                  maximizing_player: bool) -> None:
         """Apply the minimax algorithm with alpha beta pruning to self up until depth <d>.
-        Mutates self as described in the minimax docstring.
+        Mutates self as described in the minimax docstring (when <retain_tree> is True).
 
         Preconditions:
             - d >= 0
@@ -186,6 +510,242 @@ class GameTree:
                 break
         return
 
+    def _minimax_in_place(self, d: int, alpha: Union[float, int], beta: Union[float, int],
+                          maximizing_player: bool, first_move: Optional[int] = None) \
+            -> tuple[Union[int, float], Optional[int]]:
+        """Apply the minimax algorithm with alpha beta pruning to self.game_state up until depth
+        <d>, by making and undoing moves in self.game_state. Return a tuple containing the score
+        of self.game_state and the move that leads to that score, in the form (score, move).
+        The move is None if self.game_state is a terminal node or <d> is 0.
+
+        <first_move> is searched before any other move if it is not None (otherwise, the best move
+        stored in the transposition table is searched first).
+
+        self.game_state is in its original state when this method returns (or raises a
+        SearchTimeout).
+
+        Preconditions:
+            - d >= 0
+        """
+        stats = self._stats
+        stats.nodes += 1
+        stats.nodes_per_ply[self._root_depth - d] += 1
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise SearchTimeout
+        # Checking the stop event can require a lock, so it is not checked at the game states
+        # just above the leaves (which are the majority of the game states searched)
+        if self._stop is not None and d > 1 and self._stop.is_set():
+            raise SearchTimeout
+
+        # Terminating Condition (base case)
+        if d == 0 or self.is_terminal_node():
+            # Score is the heuristic value of the game state
+            stats.leaves += 1
+            return (self._calculate_score(), None)
+
+        assert self.game_state.get_valid_moves() != []
+
+        # Look up the game state in the transposition table. The stored score can be used if
+        # this game state was already searched at least as deeply, and otherwise the stored best
+        # move is searched first.
+        alpha_original, beta_original = alpha, beta
+        table_move = None
+        if self._table is not None:
+            key, mirrored = self._get_table_key()
+            entry = self._table.probe(key)
+            stats.table_probes += 1
+            if entry is not None:
+                stats.table_hits += 1
+                table_depth, flag, table_score, table_move = entry
+                if mirrored and table_move is not None:
+                    table_move = self.game_state.get_cols() - 1 - table_move
+                if table_depth >= d:
+                    if flag == EXACT:
+                        return (table_score, table_move)
+                    elif flag == LOWER_BOUND:
+                        alpha = max(alpha, table_score)
+                    else:
+                        beta = min(beta, table_score)
+
+                    if alpha >= beta:
+                        return (table_score, table_move)
+
+        if first_move is None:
+            first_move = table_move
+
+        if maximizing_player:
+            score, move = self._in_place_maximizer(d, alpha, beta, first_move)
+
+        # Minimizing player
+        else:
+            score, move = self._in_place_minimizer(d, alpha, beta, first_move)
+
+        # Store the result in the transposition table. If the score is outside of the original
+        # alpha-beta window, the search was cut off, so the score is only a bound.
+        if self._table is not None:
+            if score <= alpha_original:
+                flag = UPPER_BOUND
+            elif score >= beta_original:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            table_move = move
+            if mirrored and move is not None:
+                table_move = self.game_state.get_cols() - 1 - move
+            self._table.store(key, d, flag, score, table_move)
+
+        return (score, move)
+
+    def _in_place_maximizer(self, d: int, alpha: Union[float, int], beta: Union[float, int],
+                            first_move: Optional[int] = None) \
+            -> tuple[Union[int, float], Optional[int]]:
+        """Helper method to the _minimax_in_place method. Performs the minimax algorithm when the
+        current player is the maximizing player. <first_move> is searched before the other moves,
+        if it is not None.
+        """
+        game, arena, node = self.game_state, self._arena, self._arena_node
+        best_score, best_move = -math.inf, None
+        for i, move in enumerate(self._order_moves(d, first_move)):
+
+            # Calculate the score of the game state after the move, and then take it back
+            game.make_move(move)
+            if arena is not None:
+                child = self._arena_node = arena.add_node(node, move)
+            try:
+                if i > 0 and self._pvs:
+                    score = self._search_null_window(d - 1, alpha, beta, False)
+                else:
+                    score, _ = self._minimax_in_place(d - 1, alpha, beta, False)
+            finally:
+                game.undo_move()
+            if arena is not None:
+                arena.set_score(child, score)
+
+            # Update best score if necessary
+            if score > best_score:
+                best_score, best_move = score, move
+
+            # Alpha-beta pruning
+            alpha = max(alpha, best_score)
+            if alpha >= beta:
+                self._record_cutoff(d, move, i == 0)
+                break
+
+        return (best_score, best_move)
+
+    def _in_place_minimizer(self, d: int, alpha: Union[float, int], beta: Union[float, int],
+                            first_move: Optional[int] = None) \
+            -> tuple[Union[int, float], Optional[int]]:
+        """Helper method to the _minimax_in_place method. Performs the minimax algorithm when the
+        current player is the minimizing player. <first_move> is searched before the other moves,
+        if it is not None.
+        """
+        game, arena, node = self.game_state, self._arena, self._arena_node
+        best_score, best_move = math.inf, None
+        for i, move in enumerate(self._order_moves(d, first_move)):
+
+            # Calculate the score of the game state after the move, and then take it back
+            game.make_move(move)
+            if arena is not None:
+                child = self._arena_node = arena.add_node(node, move)
+            try:
+                if i > 0 and self._pvs:
+                    score = self._search_null_window(d - 1, alpha, beta, True)
+                else:
+                    score, _ = self._minimax_in_place(d - 1, alpha, beta, True)
+            finally:
+                game.undo_move()
+            if arena is not None:
+                arena.set_score(child, score)
+
+            # Update best score if necessary
+            if score < best_score:
+                best_score, best_move = score, move
+
+            # Alpha-beta pruning
+            beta = min(beta, best_score)
+            if alpha >= beta:
+                self._record_cutoff(d, move, i == 0)
+                break
+
+        return (best_score, best_move)
+
+    def _search_null_window(self, d: int, alpha: Union[float, int], beta: Union[float, int],
+                            maximizing_player: bool) -> Union[int, float]:
+        """Helper method to the _in_place_maximizer and _in_place_minimizer methods for principal
+        variation search. Return the score of self.game_state (searched to depth <d>) in the same
+        form as _minimax_in_place, where self.game_state was reached by a move that was not the
+        first move searched by the previous player, whose best move so far has the score
+        <alpha> (if <maximizing_player> is False) or <beta> (if it is True).
+
+        self.game_state is first searched with a null window next to that score, which only
+        proves whether the move is better than the best move so far. Only if it is (and it does
+        not cause a cutoff) is self.game_state searched again with the window (<alpha>, <beta>)
+        to find its score. Every score is an integer, so a window one wide has no scores inside
+        it, and every search with it is cut off.
+
+        Preconditions:
+            - d >= 0
+            - alpha < beta
+            - alpha and beta are not infinite
+        """
+        node = self._arena_node
+        size = 0 if self._arena is None else self._arena.get_size()
+        if maximizing_player:
+            score, _ = self._minimax_in_place(d, beta - 1, beta, True)
+        else:
+            score, _ = self._minimax_in_place(d, alpha, alpha + 1, False)
+
+        if alpha < score < beta:
+            # The game states below self.game_state are searched again, so the ones added to the
+            # arena by the null-window search are removed
+            if self._arena is not None:
+                self._arena.truncate(size)
+            self._arena_node = node
+            score, _ = self._minimax_in_place(d, alpha, beta, maximizing_player)
+        return score
+
+    def _order_moves(self, d: int, first_move: Optional[int]) -> list[int]:
+        """Return the valid moves of self.game_state in the order that the in-place minimax
+        algorithm should search them in, when self.game_state is being searched to depth <d>.
+        <first_move> (or its mirror image, if <first_move> was left out as the mirror image of
+        another move) is always first if it is not None.
+        """
+        if d == self._root_depth:
+            moves = self._root_moves
+            if first_move is not None and first_move not in moves:
+                first_move = self.game_state.get_cols() - 1 - first_move
+        else:
+            moves = self.game_state.get_valid_moves()
+        if self._ordering is None:
+            return _moves_in_order(moves, first_move)
+        return self._ordering.order(moves, self._root_depth - d, self.game_state.is_red_move(),
+                                    first_move)
+
+    def _record_cutoff(self, d: int, move: int, first: bool) -> None:
+        """Record that <move> caused a cutoff when the in-place minimax algorithm was searching
+        self.game_state to depth <d>. <first> is whether <move> was the first move searched.
+        """
+        self._stats.cutoffs += 1
+        if first:
+            self._stats.first_move_cutoffs += 1
+        if self._ordering is not None:
+            self._ordering.record_cutoff(move, self._root_depth - d,
+                                         self.game_state.is_red_move(), d)
+
+    def _get_table_key(self) -> tuple[int, bool]:
+        """Return the key that self.game_state is stored under in the transposition table, and
+        whether the moves stored under that key are for the mirror image of self.game_state, in
+        the form (key, mirrored).
+        """
+        game = self.game_state
+        key = game.get_hash()
+        if self._fold_mirrors:
+            mirror_key = game.get_mirror_hash()
+            if mirror_key < key:
+                return (mirror_key, True)
+        return (key, False)
+
     def _calculate_score(self) -> int:
         """Calculate the score of the *current* board position in the root node of self by
         determining potential power positions (e.g., three in a rows, four in a rows).
@@ -212,60 +772,23 @@ class GameTree:
         >>> tree_yellow._calculate_score()
         6
         """
-        # Note: Notice that this method considers ALL possible combinations of four, three,
+        # Note: Notice that the score considers ALL possible combinations of four, three,
         # and two in a rows! For example, the following sequence: 1, 1, 1, 1, 0, 0, ... is an
         # example of a four in a row for red, but also a three in a row, and a two in a row! Each
-        # of these will have separate influences on a player's evaluation of the board. Also, some
-        # diagonals can be counted twice (they will be detected as both a forward and a backward
-        # diagonal. See the note in the helper function _score_sub_section to better understand why
-        # this is.
-        score = 0
+        # of these will have separate influences on a player's evaluation of the board. See the
+        # note in evaluation.score_window to better understand why this is.
+        #
+        # The score of each window of the board is kept up to date by the game state as moves are
+        # made, so the score of the whole board does not need to be recalculated here.
         game, player = self.game_state, self.player
 
         # Assign a score of 0 to boards that end in a draw
         if game.get_winner() == 'Draw':
-            return score
+            return 0
 
         # Check the board from the perspective of the player
         piece = RED_PIECE if player == 'Red' else YELLOW_PIECE
-
-        rows, cols = game.get_rows(), game.get_cols()
-
-        # Check centre of board first (more opportunities can be created from centre pieces)
-        sub_centre = [int(board_piece) for board_piece in list(game.get_board()[:, cols // 2])]
-        score += CENTRE_PIECE_WORTH * sub_centre.count(piece)
-
-        # Check rows
-        for row in range(0, rows):
-            curr_row = [int(board_piece) for board_piece in list(game.get_board()[row, :])]
-            # Don't start with last three columns
-            for col in range(0, cols - 3):
-                # Check four pieces at a time
-                sub_row = curr_row[col:col + 4]
-                score += _score_sub_section(sub_row, piece)
-
-        # Check columns in a similar manner
-        for col in range(0, cols):
-            curr_col = [int(board_piece) for board_piece in list(game.get_board()[:, col])]
-            for row in range(0, rows - 3):
-                sub_col = curr_col[row:row + 4]
-                score += _score_sub_section(sub_col, piece)
-
-        # Check "/" diagonals
-        for row in range(0, rows - 3):
-            for col in range(0, cols - 3):
-                # Row increases, column increases
-                diagonal = [int(game.get_board()[row + i][col + i]) for i in range(0, 4)]
-                score += _score_sub_section(diagonal, piece)
-
-        # Check "\" diagonals
-        for row in range(0, rows - 3):
-            for col in range(0, cols - 3):
-                # Row decreases, column increases
-                diagonal = [int(game.get_board()[row + 3 - i][col + i]) for i in range(0, 4)]
-                score += _score_sub_section(diagonal, piece)
-
-        return score
+        return game.get_evaluation(piece)
 
     def _find_move_by_score(self) -> Optional[int]:
         """Return the move that should be made based on the score of this GameTree. This method
@@ -280,43 +803,47 @@ class GameTree:
         return None
 
 
-def _score_sub_section(section: list[int], piece: int) -> int:
-    """Score the sub-section <section> of the board from the perspective of the player that plays
-    with <piece> and return this score."""
-    score = 0
-    opponent_piece = RED_PIECE if piece == YELLOW_PIECE else YELLOW_PIECE
-
-    # Note: Three in a rows and two in a rows are weighted MUCH less than four in a rows because:
-    #   1. Four in a rows with empty columns beside them can also produce subsequent three AND
-    #      two in a rows when different sections of the board are passed to this function (i.e.,
-    #      a section only containing 3 of the pieces of the four in a row and also an empty spot
-    #      will be detected by this algorithm as a three in a row as well). This is intentional!
-    #      It allows the player to detect 'forks' (positions that, no matter what piece a player
-    #      plays, the other player receives an advantage either way; a 'forcing move' in a sense).
-    #   2. When playing at a certain depth, most base cases in the minimax algorithm will find
-    #      four in a rows, so three and two in a rows become more irrelevant.
-
-    # Four in a row
-    if section.count(piece) == 4:
-        score += FOUR_IN_A_ROW_SCORE
-    # Three in a row
-    elif section.count(piece) == 3 and section.count(EMPTY_PIECE) == 1:
-        score += THREE_IN_A_ROW_SCORE
-    # Two in a row
-    elif section.count(piece) == 2 and section.count(EMPTY_PIECE) == 2:
-        score += TWO_IN_A_ROW_SCORE
-
-    # Opponent four in a row
-    if section.count(opponent_piece) == 4:
-        score += OPPONENT_FOUR_IN_A_ROW_SCORE
-    # Opponent three in a row
-    elif section.count(opponent_piece) == 3 and section.count(EMPTY_PIECE) == 1:
-        score += OPPONENT_THREE_IN_A_ROW_SCORE
-    # Note: After extensive testing, opponent two in a rows were removed, as they
-    # did not contribute much (their heuristic value was -1, which is almost
-    # nothing).
-
-    return score
+def get_distinct_moves(game: ConnectFourGame) -> list[int]:
+    """Return the valid moves of <game>, leaving out each move that is the mirror image of another
+    valid move if the board of <game> is symmetric (see ConnectFourGame.is_symmetric), as the two
+    moves lead to game states with the same score. Moves are only left out of games whose game
+    states can share transposition table entries with their mirror images (see
+    _can_fold_mirrors).
+
+    >>> get_distinct_moves(ConnectFourGame())
+    [0, 1, 2, 3]
+    >>> get_distinct_moves(ConnectFourGame().copy_and_make_move(2))
+    [0, 1, 2, 3, 4, 5, 6]
+    >>> get_distinct_moves(ConnectFourGame(cols=8))
+    [0, 1, 2, 3, 4, 5, 6, 7]
+    """
+    moves = game.get_valid_moves()
+    if not _can_fold_mirrors(game) or not game.is_symmetric():
+        return moves
+    cols = game.get_cols()
+    return [move for move in moves if move <= cols - 1 - move]
+
+
+def _can_fold_mirrors(game: ConnectFourGame) -> bool:
+    """Return whether game states of <game> have the same heuristic score as their mirror images,
+    so that the minimax algorithm can treat them as the same game state.
+
+    The heuristic gives a bonus to the pieces in the centre column of the board (see
+    evaluation.py), which is only its own mirror image on boards with an odd number of columns.
+    """
+    return game.get_cols() % 2 == 1
+
+
+def _moves_in_order(moves: list[int], first_move: Optional[int]) -> list[int]:
+    """Return <moves> with <first_move> moved to the front, or <moves> itself if <first_move> is
+    None.
+
+    >>> _moves_in_order([0, 1, 2, 3], 2)
+    [2, 0, 1, 3]
+    """
+    if first_move is None:
+        return moves
+    return [first_move] + [move for move in moves if move != first_move]
 
 
 if __name__ == '__main__':
@@ -327,7 +854,8 @@ if __name__ == '__main__':
     python_ta.contracts.check_all_contracts()
 
     python_ta.check_all(config={
-        'extra-imports': ['python_ta.contracts', 'math', 'connect_four'],
+        'extra-imports': ['python_ta.contracts', 'math', 'time', 'connect_four', 'transposition',
+                          'move_ordering', 'search_stats', 'tree_arena'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['E1136']
@@ -10,6 +10,9 @@ Copyright Information
 This file is Copyright (c) 2021 Anis Singh.
 """
 from runner import run_game_two, run_game, run_games_ai
+from tournament import run_tournament, plot_results
+from players import MinimaxPlayer, RandomPlayer
+from benchmark import run_benchmark, save_baseline, check_benchmark
 
 if __name__ == '__main__':
     """
@@ -29,6 +32,7 @@ if __name__ == '__main__':
     Parameters:
       - d: determines the depth that AI uses the minimax algorithm to
       - red_starts: determines the player that starts the game
+      - ponder: determines whether the AI thinks about its reply while the user is thinking
       
     Below are a few example calls to this function. For more information, see the docstring of
     this function (found in the runner.py module).
@@ -66,3 +70,36 @@ if __name__ == '__main__':
     this function (found in the runner.py module).
     """
     # run_game_two(red_starts=True)
+
+    """
+    Function #4: run_tournament
+    
+    Play many games between two AIs without displaying them, spread over every CPU. The AIs take
+    turns playing as red, and the result of each game is written to a JSON Lines file, which can
+    then be summarized visually with plot_results.
+    
+    Parameters:
+      - player1, player2: the two AIs (create them with delay=0 so they don't wait between moves)
+      - n: the total number of games that will be played
+      - path: the file that the results are written to
+      
+    Below is an example call to this function. For more information, see the docstring of
+    this function (found in the tournament.py module).
+    """
+    # run_tournament(MinimaxPlayer(depth=4, delay=0), RandomPlayer(delay=0), n=1000,
+    #                path='results.jsonl')
+    # plot_results('results.jsonl', 'Minimax Depth 4 AI Wins', 'Random AI Wins')
+
+    """
+    Function #5: check_benchmark
+    
+    Measure how fast the minimax algorithm is on a fixed set of positions, and compare it to a
+    saved baseline. A BenchmarkRegression is raised if any position searched more game states, or
+    chose a different move. Positions that got much slower are only printed as warnings. Save a
+    baseline with save_baseline before making a change.
+    
+    Below are example calls to these functions. For more information, see their docstrings
+    (found in the benchmark.py module).
+    """
+    # save_baseline(run_benchmark(), 'baseline.json')
+    # check_benchmark('baseline.json')
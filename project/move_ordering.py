@@ -0,0 +1,202 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Move Ordering
+
+Module Description
+===============================
+This Python module contains the class that decides the order in which the minimax algorithm
+searches the moves of a game state. Alpha-beta pruning can only skip the remaining moves of a game
+state once a good enough move has been found, so searching the best moves first lets the minimax
+algorithm skip far more of the game tree.
+
+The following move ordering policies are available (each one builds on the previous one):
+    - NO_ORDERING: moves are searched from the leftmost column to the rightmost column
+    - CENTRE_FIRST: moves are searched from the centre column outwards, since pieces in the centre
+                    are part of the most possible four in a rows
+    - KILLER_MOVES: moves that caused a cutoff in another game state at the same depth of the game
+                    tree ("killer moves") are searched first
+    - HISTORY: the remaining moves are searched in order of how often they have caused cutoffs
+               anywhere in the game tree (the history heuristic)
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from __future__ import annotations
+from typing import Optional
+
+# Global Constants
+NO_ORDERING = 'none'
+CENTRE_FIRST = 'centre'
+KILLER_MOVES = 'killer'
+HISTORY = 'history'
+
+# The number of killer moves remembered for each depth of the game tree
+KILLERS_PER_PLY = 2
+
+
+class MoveOrdering:
+    """The order in which the minimax algorithm searches the moves of each game state.
+
+    Killer moves and the history heuristic learn from the cutoffs of the searches they are used
+    in, so the same MoveOrdering should be used for every search made by one player.
+
+    Instance Attributes:
+        - policy: the move ordering policy, as described in the module description
+
+    Representation Invariants:
+        - self.policy in {NO_ORDERING, CENTRE_FIRST, KILLER_MOVES, HISTORY}
+
+    >>> ordering = MoveOrdering(HISTORY)
+    >>> ordering.order([0, 1, 2, 3, 4, 5, 6], ply=0, red_move=True)
+    [3, 2, 4, 1, 5, 0, 6]
+    >>> ordering.record_cutoff(6, ply=1, red_move=False, depth=3)
+    >>> ordering.order([0, 1, 2, 3, 4, 5, 6], ply=1, red_move=False)
+    [6, 3, 2, 4, 1, 5, 0]
+    >>> ordering.order([0, 1, 2, 3, 4, 5, 6], ply=1, red_move=False, first_move=0)
+    [0, 6, 3, 2, 4, 1, 5]
+    """
+    policy: str
+
+    # Private Instance Attributes:
+    #   - _cols: the number of columns of the board whose moves are ordered
+    #   - _centre_order: maps each column to its position in the centre-first order
+    #   - _killers: the killer moves for each ply (depth of the game tree, starting from 0 at the
+    #               root), most recent first
+    #   - _history: maps whether it is red's move to a list of how much each column has caused
+    #               cutoffs, weighted by the remaining depth of the search at the cutoff
+    _cols: int
+    _centre_order: dict[int, int]
+    _killers: list[list[int]]
+    _history: dict[bool, list[int]]
+
+    def __init__(self, policy: str = HISTORY, cols: int = 7) -> None:
+        """Initialize a new MoveOrdering with the given policy for a board with <cols> columns.
+
+        Preconditions:
+            - policy in {NO_ORDERING, CENTRE_FIRST, KILLER_MOVES, HISTORY}
+            - cols > 0
+        """
+        self.policy = policy
+        self._cols = cols
+        centre_first = sorted(range(cols), key=lambda col: (abs(2 * col - (cols - 1)), col))
+        self._centre_order = {col: i for i, col in enumerate(centre_first)}
+        self._killers = []
+        self._history = {True: [0] * cols, False: [0] * cols}
+
+    def get_cols(self) -> int:
+        """Return the number of columns of the board whose moves this MoveOrdering orders."""
+        return self._cols
+
+    def copy(self) -> MoveOrdering:
+        """Return a copy of this MoveOrdering, which can learn from other searches without
+        changing this MoveOrdering.
+
+        >>> ordering = MoveOrdering(KILLER_MOVES)
+        >>> copy_ordering = ordering.copy()
+        >>> copy_ordering.record_cutoff(0, ply=0, red_move=True, depth=1)
+        >>> ordering.order([0, 3], ply=0, red_move=True), copy_ordering.order([0, 3], 0, True)
+        ([3, 0], [0, 3])
+        """
+        new_ordering = MoveOrdering.__new__(MoveOrdering)
+        new_ordering.policy, new_ordering._cols = self.policy, self._cols
+        new_ordering._centre_order = self._centre_order
+        new_ordering._killers = [killers.copy() for killers in self._killers]
+        new_ordering._history = {red_move: history.copy()
+                                 for red_move, history in self._history.items()}
+        return new_ordering
+
+    def order(self, moves: list[int], ply: int, red_move: bool,
+              first_move: Optional[int] = None) -> list[int]:
+        """Return <moves> in the order that they should be searched in, for a game state at depth
+        <ply> of the game tree where <red_move> is whether it is red's move.
+
+        <first_move> (e.g., the best move stored in a transposition table) is always searched
+        first if it is not None.
+
+        Preconditions:
+            - ply >= 0
+            - first_move is None or first_move in moves
+        """
+        if self.policy == NO_ORDERING:
+            ordered = list(moves)
+        elif self.policy == HISTORY:
+            history = self._history[red_move]
+            ordered = sorted(moves, key=lambda col: (-history[col], self._centre_order[col]))
+        else:
+            ordered = sorted(moves, key=self._centre_order.__getitem__)
+
+        if self.policy in {KILLER_MOVES, HISTORY} and ply < len(self._killers):
+            killers = [move for move in self._killers[ply] if move in moves]
+            ordered = killers + [move for move in ordered if move not in killers]
+
+        if first_move is not None:
+            ordered = [first_move] + [move for move in ordered if move != first_move]
+
+        return ordered
+
+    def record_cutoff(self, move: int, ply: int, red_move: bool, depth: int) -> None:
+        """Record that <move> caused a cutoff in a game state at depth <ply> of the game tree where
+        <red_move> is whether it is red's move, and that was being searched <depth> more moves
+        deep.
+
+        Preconditions:
+            - ply >= 0
+            - depth > 0
+        """
+        if self.policy in {KILLER_MOVES, HISTORY}:
+            while len(self._killers) <= ply:
+                self._killers.append([])
+            killers = self._killers[ply]
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+
+        if self.policy == HISTORY:
+            # Cutoffs close to the root of the game tree prune more, so they count for more
+            self._history[red_move][move] += depth * depth
+
+    def new_search(self, plies: Optional[int] = None) -> None:
+        """Prepare for a new search from a different root game state.
+
+        Killer moves are specific to a depth of the game tree, so they are forgotten, unless
+        <plies> is given: then the new root game state is <plies> moves after the root of the
+        previous search, and the killer moves of each ply are moved up by <plies> plies, since the
+        game states that were at ply <plies> + i of the previous search are now at ply i. The
+        history of each move is halved so that recent searches count for more than older ones.
+
+        Preconditions:
+            - plies is None or plies >= 0
+
+        >>> ordering = MoveOrdering(KILLER_MOVES)
+        >>> ordering.record_cutoff(0, ply=2, red_move=True, depth=1)
+        >>> ordering.new_search(plies=2)
+        >>> ordering.order([0, 1, 2, 3, 4, 5, 6], ply=0, red_move=True)
+        [0, 3, 2, 4, 1, 5, 6]
+        >>> ordering.new_search()
+        >>> ordering.order([0, 1, 2, 3, 4, 5, 6], ply=0, red_move=True)
+        [3, 2, 4, 1, 5, 0, 6]
+        """
+        if plies is None:
+            self._killers = []
+        else:
+            self._killers = self._killers[plies:]
+        for history in self._history.values():
+            for col in range(0, len(history)):
+                history[col] //= 2
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,261 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Opening Book
+
+Module Description
+===============================
+This Python module contains the opening book, which stores the best move for every game state that
+can occur in the first few moves of a game. These game states are the same in every game, so rather
+than searching them with the minimax algorithm each time, they are searched once (and much more
+deeply than a player could afford to during a game) by build_book, and then looked up by an
+OpeningBook.
+
+A game state and its mirror image (its board flipped from left to right) have mirrored best moves,
+so only one of the two is stored: the one with the smaller hash.
+
+The book is stored in a binary file that starts with a header, followed by one fixed-size record
+for each game state, sorted by hash. An OpeningBook memory-maps the file and binary searches the
+records, so no time is spent reading the file when the book is opened, and only the few records
+that a lookup touches are ever read from the disk.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Optional
+import mmap
+import struct
+import game_tree
+from connect_four import ConnectFourGame
+from move_ordering import MoveOrdering
+from transposition import TranspositionTable
+
+# Global Constants
+BOOK_MAGIC = b'C4OB'
+
+# The header of a book file: the magic bytes, the number of rows and columns of the board, the
+# number of pieces in a row needed to win, the number of moves covered by the book, and the depth
+# the game states were searched to
+_HEADER = struct.Struct('<4sBBBBB')
+
+# A record of a book file: the hash of a game state (the smaller of its hash and its mirror
+# image's hash), and the best move in the game state with that hash
+_RECORD = struct.Struct('<QB')
+
+
+class OpeningBook:
+    """An opening book that is read from a file created by build_book.
+
+    >>> import os
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'book.bin')
+    >>> build_book(path, plies=2, depth=2)
+    10
+    >>> book = OpeningBook(path)
+    >>> game = ConnectFourGame()
+    >>> book.lookup(game)
+    3
+    >>> game.make_move(0)
+    >>> book.lookup(game)
+    3
+    >>> game.make_move(3)
+    >>> book.lookup(game) is None
+    True
+    >>> book.close()
+
+    A book is copied (or pickled) by its path, so a player that uses a book can be copied too:
+
+    >>> import copy
+    >>> from players import MinimaxPlayer
+    >>> player = copy.deepcopy(MinimaxPlayer(depth=2, book=OpeningBook(path), delay=0))
+    >>> player.make_move(ConnectFourGame(), None)
+    3
+    """
+    # Private Instance Attributes:
+    #   - _path: the path of the book file
+    #   - _file: the book file
+    #   - _map: the memory-mapped contents of the book file
+    #   - _rows: the number of rows of the board of the game states in this book
+    #   - _cols: the number of columns of the board of the game states in this book
+    #   - _connect: the number of pieces in a row needed to win the games in this book
+    #   - _plies: the number of moves this book covers (i.e., this book has a move for every game
+    #             state where less than this many moves have been made)
+    #   - _depth: the depth the game states in this book were searched to
+    #   - _records: the number of game states in this book
+    _path: str
+    _file: object
+    _map: mmap.mmap
+    _rows: int
+    _cols: int
+    _connect: int
+    _plies: int
+    _depth: int
+    _records: int
+
+    def __init__(self, path: str) -> None:
+        """Open the opening book stored in the file at <path>.
+
+        Raise a ValueError if the file is not a book created by build_book.
+
+        >>> import os
+        >>> import tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'empty.bin')
+        >>> open(path, 'wb').close()
+        >>> try:
+        ...     OpeningBook(path)
+        ... except ValueError:
+        ...     print('The file is not an opening book')
+        The file is not an opening book
+        """
+        self._path = path
+        self._file = open(path, 'rb')
+        try:
+            # An empty file cannot be memory-mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'"{path}" is not an opening book')
+
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f'"{path}" is not an opening book')
+        magic, self._rows, self._cols, self._connect, self._plies, self._depth = \
+            _HEADER.unpack_from(self._map)
+        if magic != BOOK_MAGIC or (len(self._map) - _HEADER.size) % _RECORD.size != 0:
+            self.close()
+            raise ValueError(f'"{path}" is not an opening book')
+
+        self._records = (len(self._map) - _HEADER.size) // _RECORD.size
+
+    def __reduce__(self) -> tuple:
+        """Return how to pickle (or copy) this book: by its path, since an open file and a memory
+        map cannot be pickled. The copy opens the book file again.
+        """
+        return (OpeningBook, (self._path,))
+
+    def lookup(self, game: ConnectFourGame) -> Optional[int]:
+        """Return the best move stored in this book for the current state of <game>, or None if
+        this book has no move for it.
+        """
+        if game.get_moves_made() >= self._plies or game.get_rows() != self._rows \
+                or game.get_cols() != self._cols or game.get_connect() != self._connect:
+            return None
+
+        key, mirror_key = game.get_hash(), game.get_mirror_hash()
+        target = min(key, mirror_key)
+
+        # Binary search the records, which are sorted by hash
+        low, high = 0, self._records
+        while low < high:
+            middle = (low + high) // 2
+            record_key, move = _RECORD.unpack_from(self._map, _HEADER.size + middle * _RECORD.size)
+            if record_key < target:
+                low = middle + 1
+            elif record_key > target:
+                high = middle
+            else:
+                # The stored move is for the mirror image of this game state
+                if key > mirror_key:
+                    move = self._cols - 1 - move
+                return move if game.is_valid_move(move) else None
+
+        return None
+
+    def get_plies(self) -> int:
+        """Return the number of moves at the start of a game that this book covers."""
+        return self._plies
+
+    def get_depth(self) -> int:
+        """Return the depth that the game states in this book were searched to."""
+        return self._depth
+
+    def get_size(self) -> int:
+        """Return the number of game states stored in this book."""
+        return self._records
+
+    def close(self) -> None:
+        """Close the book file."""
+        self._map.close()
+        self._file.close()
+
+
+def build_book(path: str, plies: int = 4, depth: int = 9, table_size: int = 2 ** 20,
+               rows: int = 6, cols: int = 7, connect: int = 4) -> int:
+    """Create an opening book in a file at <path> that stores the best move for every game state
+    where less than <plies> moves have been made (with either player moving first), as found by
+    the minimax algorithm up until depth <depth>. Return the number of game states in the book.
+
+    The book is for games with a board with <rows> rows and <cols> columns, where <connect> pieces
+    in a row are needed to win.
+
+    The searches use transposition tables with <table_size> entries, which are shared between
+    all of the searches from the same player's perspective.
+
+    Preconditions:
+        - 0 < plies <= rows * cols
+        - 0 < depth <= rows * cols
+        - table_size >= 2
+        - 0 < rows <= 255 and 0 < cols <= 255
+        - 2 <= connect <= max(rows, cols)
+    """
+    moves = {}
+    tables = {'Red': TranspositionTable(table_size), 'Yellow': TranspositionTable(table_size)}
+    ordering = MoveOrdering(cols=cols)
+    for red_starts in (True, False):
+        _add_game_states(ConnectFourGame(red_starts, rows, cols, connect), plies, depth, tables,
+                         ordering, moves)
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(BOOK_MAGIC, rows, cols, connect, plies, depth))
+        for key in sorted(moves):
+            file.write(_RECORD.pack(key, moves[key]))
+
+    return len(moves)
+
+
+def _add_game_states(game: ConnectFourGame, plies: int, depth: int,
+                     tables: dict[str, TranspositionTable], ordering: MoveOrdering,
+                     moves: dict[int, int]) -> None:
+    """Add the best move for the current state of <game>, and every game state after it where less
+    than <plies> moves have been made, to <moves>, as found by the minimax algorithm up until
+    depth <depth>. <moves> maps the smaller of the hash of a game state and the hash of its mirror
+    image to the best move in the game state with that hash.
+
+    <game> is in its original state when this function returns.
+    """
+    if game.get_moves_made() >= plies or game.get_winner() is not None \
+            or game.get_valid_moves() == []:
+        return
+
+    key, mirror_key = game.get_hash(), game.get_mirror_hash()
+    if min(key, mirror_key) in moves:
+        # This game state (or its mirror image), and so every game state after it, has already
+        # been added
+        return
+
+    player = 'Red' if game.is_red_move() else 'Yellow'
+    ordering.new_search()
+    tree = game_tree.GameTree(player, game_tree.ROOT_MOVE, game)
+    move = tree.minimax(depth, table=tables[player], ordering=ordering)
+    moves[min(key, mirror_key)] = move if key <= mirror_key else game.get_cols() - 1 - move
+
+    for next_move in game.get_valid_moves():
+        game.make_move(next_move)
+        _add_game_states(game, plies, depth, tables, ordering, moves)
+        game.undo_move()
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'mmap', 'struct', 'game_tree',
+                          'connect_four', 'move_ordering', 'transposition'],
+        'allowed-io': ['OpeningBook.__init__', 'build_book'],
+        'max-line-length': 100,
+        'disable': ['E1136', 'R1732']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,424 @@
+"""CSC111 Winter 2021 Final Project: Parallel Connect Four Search
+
+Module Description
+===============================
+This Python module contains the classes that run the minimax algorithm on several processes at
+once, in one of the following modes:
+    - ROOT_SPLIT: the subtrees below each move of the root game state are independent of each
+                  other, so each one is searched by a different process. Alpha-beta pruning still
+                  works across processes: the best score found so far at the root (alpha) is kept
+                  in shared memory, so a process that starts searching a move after another
+                  process has found a good move can prune its subtree with that score.
+    - LAZY_SMP: the whole game tree is searched by one process, while helper processes search the
+                same game tree to slightly different depths and in slightly different orders. Every
+                process reads and writes the same transposition table, which is kept in shared
+                memory, so the main search finds many of its game states already searched by the
+                helpers.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing import shared_memory
+from typing import Optional, Union
+import math
+import multiprocessing
+import game_tree
+from connect_four import ConnectFourGame
+from move_ordering import MoveOrdering, CENTRE_FIRST, HISTORY
+from transposition import TranspositionTable, get_buffer_size
+
+# Global Constants
+ROOT_SPLIT = 'root-split'
+LAZY_SMP = 'lazy-smp'
+
+
+class RootSplitSearch:
+    """A pool of processes that run the minimax algorithm by searching the moves of the root game
+    state in parallel.
+
+    The processes are started once and reused for every search, and each process keeps its own
+    transposition tables and move ordering between searches. Like a MinimaxPlayer's own move
+    ordering, the move ordering of each process is prepared for a new search (see
+    MoveOrdering.new_search) whenever it searches from a different root game state than before.
+    Call close when the pool is no longer needed.
+
+    >>> search = RootSplitSearch(workers=2, table_size=1024)
+    >>> search.minimax(ConnectFourGame(), 'Red', d=2)
+    3
+    >>> search.close()
+    """
+    # Private Instance Attributes:
+    #   - _executor: the pool of processes that run the searches
+    #   - _alpha: the best score found so far for the root game state of the current search,
+    #             shared between every process
+    #   - _workers: the number of processes in the pool
+    _executor: ProcessPoolExecutor
+    _alpha: multiprocessing.Value
+    _workers: int
+
+    def __init__(self, workers: int, table_size: int = 2 ** 18, ordering: str = HISTORY) -> None:
+        """Initialize a new pool of <workers> processes. Each process uses transposition tables
+        that hold <table_size> entries (or none if <table_size> is 0), and the move ordering
+        policy <ordering>.
+
+        Preconditions:
+            - workers > 0
+            - table_size == 0 or table_size >= 2
+            - ordering in {'none', 'centre', 'killer', 'history'}
+        """
+        self._workers = workers
+        self._alpha = multiprocessing.Value('d', -math.inf)
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker,
+                                             initargs=(self._alpha, table_size, ordering))
+
+    def minimax(self, game: ConnectFourGame, player: str, d: int,
+                first_move: Optional[int] = None, deadline: Optional[float] = None) -> int:
+        """Return the move that should be chosen by <player> in <game>, by applying the minimax
+        algorithm with alpha beta pruning up until depth <d>.
+
+        The first move (<first_move> if it is not None, otherwise the centre-most move) is
+        searched on its own to get a good alpha for the other moves, which are then searched in
+        parallel. Moves that are the mirror image of another move are not searched (see
+        game_tree.get_distinct_moves). A SearchTimeout is raised if the search is still running
+        at time <deadline> (as returned by time.monotonic, whose times, unlike those of
+        time.perf_counter, are comparable between the processes of the pool).
+
+        <game> is not mutated.
+
+        Preconditions:
+            - d > 0
+            - player == ('Red' if game.is_red_move() else 'Yellow')
+            - there is at least one valid move in game
+            - first_move is None or first_move in game.get_valid_moves()
+        """
+        moves = game_tree.get_distinct_moves(game)
+        if first_move is not None and first_move not in moves:
+            first_move = game.get_cols() - 1 - first_move
+        moves = MoveOrdering(CENTRE_FIRST, game.get_cols()).order(moves, 0, game.is_red_move(),
+                                                                  first_move)
+        history = game.get_move_history()
+        red_starts = game.is_red_move() == (game.get_moves_made() % 2 == 0)
+        size = (game.get_rows(), game.get_cols(), game.get_connect())
+        self._alpha.value = -math.inf
+
+        def submit(move: int) -> Future:
+            """Submit the search of the subtree below <move> to the pool."""
+            return self._executor.submit(_search_move, type(game), red_starts, size, history,
+                                         move, player, d, deadline)
+
+        results = [submit(moves[0]).result()]
+        futures = [submit(move) for move in moves[1:]]
+        results.extend(future.result() for future in futures)
+
+        if any(result is None for result in results):
+            raise game_tree.SearchTimeout
+
+        # Choose the move with the best score. A move whose search failed low (scored at most the
+        # alpha it started with) only has an upper bound for its score, so a move with an exact
+        # score is chosen over it when their scores are tied.
+        best_move, best_key = moves[0], None
+        for move, (score, failed_low) in zip(moves, results):
+            if best_key is None or (score, not failed_low) > best_key:
+                best_move, best_key = move, (score, not failed_low)
+
+        return best_move
+
+    def get_workers(self) -> int:
+        """Return the number of processes in this pool."""
+        return self._workers
+
+    def close(self) -> None:
+        """Shut down the processes of this pool."""
+        self._executor.shutdown()
+
+
+class LazySMPSearch:
+    """A pool of helper processes that search the same game tree as the minimax algorithm, to fill
+    a transposition table that is shared with it.
+
+    The shared transposition tables (one for each player) are kept in shared memory, so they
+    are not copied into each process. The processes are started once and reused for every search,
+    and the transposition tables are kept between searches. As in RootSplitSearch, the move
+    ordering of the main search and of each helper is prepared for a new search whenever it
+    searches from a different root game state than before. Call close when the pool is no longer
+    needed.
+
+    >>> search = LazySMPSearch(workers=2, table_size=1024)
+    >>> search.minimax(ConnectFourGame(), 'Red', d=2)
+    3
+    >>> search.close()
+    """
+    # Private Instance Attributes:
+    #   - _executor: the pool of helper processes
+    #   - _stop: the event that is set to stop the helper processes once the main search finishes
+    #   - _workers: the number of processes that search, including the main search
+    #   - _table_size: the number of entries in each shared transposition table
+    #   - _ordering: the move ordering of the main search
+    #   - _root: the root game state (as returned by _get_root) of the last main search, or None
+    #            if there has not been one
+    #   - _memory: maps 'Red' and 'Yellow' to the shared memory of the transposition table used
+    #              when searching as that player
+    #   - _tables: maps 'Red' and 'Yellow' to the transposition table used when searching as that
+    #              player
+    _executor: ProcessPoolExecutor
+    _stop: multiprocessing.Event
+    _workers: int
+    _table_size: int
+    _ordering: MoveOrdering
+    _root: Optional[tuple]
+    _memory: dict[str, shared_memory.SharedMemory]
+    _tables: dict[str, TranspositionTable]
+
+    def __init__(self, workers: int, table_size: int = 2 ** 18, ordering: str = HISTORY) -> None:
+        """Initialize a new pool of <workers> - 1 helper processes (the main search runs in this
+        process). The shared transposition tables hold <table_size> entries, and every search uses
+        the move ordering policy <ordering>.
+
+        Preconditions:
+            - workers > 1
+            - table_size >= 2
+            - ordering in {'none', 'centre', 'killer', 'history'}
+        """
+        self._workers = workers
+        self._table_size = table_size
+        self._ordering = MoveOrdering(ordering)
+        self._root = None
+        self._memory = {}
+        self._tables = {}
+        self._stop = multiprocessing.Event()
+        self._executor = ProcessPoolExecutor(max_workers=workers - 1,
+                                             initializer=_initialize_helper,
+                                             initargs=(self._stop, ordering))
+
+    def minimax(self, game: ConnectFourGame, player: str, d: int,
+                first_move: Optional[int] = None, deadline: Optional[float] = None) -> int:
+        """Return the move that should be chosen by <player> in <game>, by applying the minimax
+        algorithm with alpha beta pruning up until depth <d>.
+
+        While the main search runs, half of the helpers search to depth <d> + 1 instead of <d>,
+        and each helper searches a different move of the root game state first, so that the
+        helpers search different parts of the game tree. The helpers are stopped as soon as the
+        main search finishes. A SearchTimeout is raised if the main search is still running at
+        time <deadline> (as returned by time.monotonic).
+
+        <game> is not mutated.
+
+        Preconditions:
+            - d > 0
+            - player == ('Red' if game.is_red_move() else 'Yellow')
+            - there is at least one valid move in game
+            - first_move is None or first_move in game.get_valid_moves()
+        """
+        table = self._get_table(player)
+        history = game.get_move_history()
+        red_starts = game.is_red_move() == (game.get_moves_made() % 2 == 0)
+        size = (game.get_rows(), game.get_cols(), game.get_connect())
+        moves = game_tree.get_distinct_moves(game)
+        root = _get_root(red_starts, size, history)
+        if self._ordering.get_cols() != game.get_cols():
+            self._ordering = MoveOrdering(self._ordering.policy, game.get_cols())
+        elif root != self._root:
+            self._ordering.new_search()
+        self._root = root
+
+        self._stop.clear()
+        helpers = [self._executor.submit(_help_search, type(game), red_starts, size, history,
+                                         player, d + i % 2, moves[i % len(moves)],
+                                         self._memory[player].name, self._table_size, deadline)
+                   for i in range(1, self._workers)]
+
+        try:
+            tree = game_tree.GameTree(player, game_tree.ROOT_MOVE, game)
+            return tree.minimax(d, table=table, first_move=first_move, deadline=deadline,
+                                ordering=self._ordering)
+        finally:
+            # Wait for the helpers to stop, so that they do not keep running into the next search
+            self._stop.set()
+            for helper in helpers:
+                helper.result()
+
+    def get_workers(self) -> int:
+        """Return the number of processes that search, including the main search."""
+        return self._workers
+
+    def close(self) -> None:
+        """Shut down the helper processes of this pool, and free the shared transposition
+        tables."""
+        self._executor.shutdown()
+        # The tables must be removed before the shared memory they are stored in is closed
+        self._tables.clear()
+        for memory in self._memory.values():
+            memory.close()
+            memory.unlink()
+        self._memory.clear()
+
+    def _get_table(self, player: str) -> TranspositionTable:
+        """Return the shared transposition table used when searching as <player>, creating it if
+        it does not exist yet.
+
+        Preconditions:
+            - player in {'Red', 'Yellow'}
+        """
+        if player not in self._tables:
+            memory = shared_memory.SharedMemory(create=True,
+                                                size=get_buffer_size(self._table_size))
+            self._memory[player] = memory
+            self._tables[player] = TranspositionTable(self._table_size, buffer=memory.buf)
+        return self._tables[player]
+
+
+# The state of each process in a RootSplitSearch pool: the shared alpha of the current search, the
+# transposition table size, the transposition tables for each player, the move ordering of the
+# process and the root game state (as returned by _get_root) of the last search it was used for
+_worker_alpha = None
+_worker_table_size = 0
+_worker_tables = {}
+_worker_ordering = None
+_worker_root = None
+
+# The state of each process in a LazySMPSearch pool: the event that stops the helper searches,
+# and the shared memory and transposition table for each shared memory name (the move ordering
+# of the process, and the root game state it was last used for, are _worker_ordering and
+# _worker_root)
+_helper_stop = None
+_helper_tables = {}
+
+
+def _initialize_worker(alpha: multiprocessing.Value, table_size: int, ordering: str) -> None:
+    """Initialize the state of a process in a RootSplitSearch pool."""
+    global _worker_alpha, _worker_table_size, _worker_ordering, _worker_root
+    _worker_alpha, _worker_table_size = alpha, table_size
+    _worker_ordering, _worker_root = MoveOrdering(ordering), None
+    _worker_tables.clear()
+
+
+def _initialize_helper(stop: multiprocessing.Event, ordering: str) -> None:
+    """Initialize the state of a process in a LazySMPSearch pool."""
+    global _helper_stop, _worker_ordering, _worker_root
+    _helper_stop = stop
+    _worker_ordering, _worker_root = MoveOrdering(ordering), None
+    _helper_tables.clear()
+
+
+def _search_move(game_class: type, red_starts: bool, size: tuple[int, int, int],
+                 history: list[int], move: int, player: str, d: int,
+                 deadline: Optional[float]) -> Optional[tuple[Union[int, float], bool]]:
+    """Return the score of making <move> in the game that results from making the moves in
+    <history> in a new game of type <game_class> (where <red_starts> is whether red moved first,
+    and <size> is as described in _replay_game), from the perspective of <player>, by applying
+    the minimax algorithm up until depth <d> - 1 after the move.
+
+    The result is returned in the form (score, failed_low), where failed_low is whether the score
+    is only an upper bound because it was no better than the shared alpha. Return None if the
+    search did not finish before <deadline>.
+    """
+    game = _replay_game(game_class, red_starts, size, history)
+    game.make_move(move)
+
+    alpha = _worker_alpha.value
+    table = None
+    if _worker_table_size > 0:
+        if player not in _worker_tables:
+            _worker_tables[player] = TranspositionTable(_worker_table_size)
+        table = _worker_tables[player]
+
+    ordering = _get_worker_ordering(game.get_cols(), _get_root(red_starts, size, history))
+    tree = game_tree.GameTree(player, move, game)
+    try:
+        score = tree.minimax_score(d - 1, alpha, math.inf, False, table, deadline, ordering)
+    except game_tree.SearchTimeout:
+        return None
+
+    # Share the score with the other processes if it is the best one found so far
+    with _worker_alpha.get_lock():
+        if score > _worker_alpha.value:
+            _worker_alpha.value = score
+
+    return (score, score <= alpha)
+
+
+def _help_search(game_class: type, red_starts: bool, size: tuple[int, int, int],
+                 history: list[int], player: str, d: int, first_move: int, memory_name: str,
+                 table_size: int, deadline: Optional[float]) -> None:
+    """Search the game that results from making the moves in <history> in a new game of type
+    <game_class> (where <red_starts> is whether red moved first, and <size> is as described in
+    _replay_game) with the minimax algorithm up until depth <d>, searching <first_move> first,
+    and storing the results in the transposition table with <table_size> entries in the shared
+    memory named <memory_name>.
+
+    The search stops once the stop event of the pool is set or <deadline> has passed.
+    """
+    if memory_name not in _helper_tables:
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _helper_tables[memory_name] = (memory, TranspositionTable(table_size, buffer=memory.buf))
+    _, table = _helper_tables[memory_name]
+
+    game = _replay_game(game_class, red_starts, size, history)
+    ordering = _get_worker_ordering(game.get_cols(), _get_root(red_starts, size, history))
+    tree = game_tree.GameTree(player, game_tree.ROOT_MOVE, game)
+    try:
+        tree.minimax(d, table=table, first_move=first_move, deadline=deadline, ordering=ordering,
+                     stop=_helper_stop)
+    except game_tree.SearchTimeout:
+        pass
+
+
+def _get_worker_ordering(cols: int, root: Optional[tuple]) -> MoveOrdering:
+    """Return the move ordering of this process for a board with <cols> columns, replacing it
+    with a new one with the same policy if it was for a board with a different number of
+    columns.
+
+    <root> is the root game state (as returned by _get_root) of the search the move ordering is
+    for. If it is not the root of the last search the move ordering was used for, the move
+    ordering is prepared for a new search, since its killer moves are for the plies of a
+    different game tree. (The tasks of one root search, and the searches of one move to
+    increasing depths, share a root and keep learning from each other, as in a MinimaxPlayer.)
+    """
+    global _worker_ordering, _worker_root
+    if _worker_ordering.get_cols() != cols:
+        _worker_ordering = MoveOrdering(_worker_ordering.policy, cols)
+    elif root != _worker_root:
+        _worker_ordering.new_search()
+    _worker_root = root
+    return _worker_ordering
+
+
+def _get_root(red_starts: bool, size: tuple[int, int, int], history: list[int]) -> tuple:
+    """Return a value that identifies the root game state of a search, which is reached by making
+    the moves in <history> in a new game where <red_starts> is whether red moved first, and
+    <size> is as described in _replay_game.
+    """
+    return (red_starts, size, tuple(history))
+
+
+def _replay_game(game_class: type, red_starts: bool, size: tuple[int, int, int],
+                 history: list[int]) -> ConnectFourGame:
+    """Return a new game of type <game_class> (where <red_starts> is whether red moves first)
+    after making the moves in <history>. <size> is the number of rows and columns of the board
+    and the number of pieces in a row needed to win, in the form (rows, cols, connect)."""
+    game = game_class(red_starts, *size)
+    for move in history:
+        game.make_move(move)
+    return game
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'concurrent.futures', 'math', 'multiprocessing',
+                          'multiprocessing.shared_memory', 'game_tree', 'connect_four',
+                          'move_ordering', 'transposition'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136', 'W0603']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
@@ -11,11 +11,17 @@ Copyright Information
 ===============================
 This file is Copyright (c) 2021 Anis Singh.
 """
-from typing import Optional
+from typing import Any, Callable, Optional, Union
 import random
 import time
 import game_tree
 from connect_four import ConnectFourGame
+from transposition import TranspositionTable
+from move_ordering import MoveOrdering, HISTORY, CENTRE_FIRST
+from parallel import RootSplitSearch, LazySMPSearch, ROOT_SPLIT, LAZY_SMP
+from opening_book import OpeningBook
+from solver import EndgameSolver, Solution, ENDGAME_THRESHOLD
+from search_stats import SearchStats
 
 
 def user_make_move(game: ConnectFourGame, previous_move: Optional[int], move: int) -> Optional[int]:
@@ -57,32 +63,67 @@ class PlayerAI:
     https://www.teach.cs.toronto.edu/~csc111h/winter/assignments/a2/handout/
     """
 
-    def make_move(self, game: ConnectFourGame, previous_move: Optional[int]) -> int:
+    def make_move(self, game: ConnectFourGame, previous_move: Optional[int],
+                  stop: Optional[Any] = None) -> int:
         """Make a move in the given Connect Four game.
 
         <previous_move> is the opponent's most recent move, or None if no moves have been made.
 
+        If <stop> (an event such as a threading.Event) is not None, the AI makes the best move it
+        has found so far as soon as it can once <stop> is set (e.g., when the move is being
+        chosen in another thread, and the user closes the window; see background.py).
+
         Preconditions:
             - There is at least one valid move for the given game
         """
         raise NotImplementedError
 
+    def set_delay(self, delay: float) -> None:
+        """Set the number of seconds this AI waits before making its moves to <delay>. An AI
+        that never waits ignores this.
+
+        Preconditions:
+            - delay >= 0
+        """
+
 
 class RandomPlayer(PlayerAI):
     """A Connect Four AI Player that randomly chooses a move on each turn."""
+    # Private Instance Attributes:
+    #  -_delay: the number of seconds this AI waits before making each move
+    _delay: float
+
+    def __init__(self, delay: float = 0.5) -> None:
+        """Initialize a new RandomPlayer that waits <delay> seconds before making each move.
+
+        Preconditions:
+            - delay >= 0
+        """
+        self._delay = delay
 
-    def make_move(self, game: ConnectFourGame, previous_move: Optional[int]) -> int:
+    def set_delay(self, delay: float) -> None:
+        """Set the number of seconds this AI waits before making each move to <delay>.
+
+        Preconditions:
+            - delay >= 0
+        """
+        self._delay = delay
+
+    def make_move(self, game: ConnectFourGame, previous_move: Optional[int],
+                  stop: Optional[Any] = None) -> int:
         """Choose and make a random valid move in the given Connect Four game. Return the move
         that was made.
 
         <previous_move> is the opponent's most recent move, or None if no moves have been made.
 
-        Wait 0.5 seconds before making the move.
+        Wait self._delay seconds (or until <stop> is set, if it is not None) before making the
+        move.
 
         Preconditions:
            - There is at least one valid move for the given game
         """
-        time.sleep(0.5)
+        if self._delay > 0:
+            _wait(self._delay, stop)
         move = random.choice(game.get_valid_moves())
         game.make_move(move)
         return move
@@ -91,46 +132,499 @@ class RandomPlayer(PlayerAI):
 class MinimaxPlayer(PlayerAI):
     """A Connect Four AI Player that makes moves by using the minimax algorithm to a certain
     depth.
+
+    If the AI is given a time limit, it instead searches to depth 1, 2, 3, ... until it runs out of
+    time (iterative deepening), and makes the best move found by the deepest search that finished.
+
+    The results of each search are kept in a transposition table, so game states that were
+    already searched on a previous move do not need to be searched again. The moves of each game
+    state are searched in the order given by a move ordering policy (see move_ordering.py).
+
+    After each search, the AI remembers the principal variation it found: the reply it expects
+    from its opponent, and the move it expects to make after that. If the opponent makes the
+    expected reply, the next search starts with the expected move, and the killer moves found two
+    plies deep in the previous search are used at the root of the new one.
+
+    If the AI is given more than one worker, it searches with a pool of processes, using one of
+    the parallel search modes described in parallel.py. Call close when the AI is no longer needed
+    to shut the processes down.
+
+    If the AI is given an opening book, it plays the move stored in the book for each game state
+    that the book covers, without searching.
+
+    Once few enough empty cells remain on the board, the AI stops using the minimax algorithm, and
+    instead finds the exact result of the game with perfect play (see solver.py), which it then
+    plays towards.
+
+    While its opponent is thinking, the AI can search the game states its opponent's possible
+    replies lead to (pondering), so that it can answer immediately (see ponder).
+
+    The AI can search with principal variation search instead of plain alpha-beta pruning (see
+    GameTree.minimax). With iterative deepening, each search after the first then starts with an
+    aspiration window around the score found by the search before it.
     """
     # Private Instance Attributes:
-    #  -_depth: the depth that this AI uses in the minimax algorithm
-    _depth: int
-
-    def __init__(self, depth: int) -> None:
-        """Initialize a new MinimaxPlayer that uses the minimax algorithm to the given depth.
+    #  -_depth: the depth that this AI uses in the minimax algorithm, or the maximum depth it
+    #           searches to if it has a time limit (None if there is no maximum depth)
+    #  -_time_limit: the number of seconds this AI has to choose each move, or None if it always
+    #                searches to self._depth
+    #  -_table_size: the number of entries in each of this AI's transposition tables, or 0 if
+    #                this AI does not use transposition tables
+    #  -_tables: maps 'Red' and 'Yellow' to the transposition table used when this AI plays
+    #            as that player (scores in a transposition table are from one player's
+    #            perspective)
+    #  -_ordering: the order this AI searches moves in
+    #  -_algorithm: the search algorithm this AI uses in the minimax algorithm
+    #  -_workers: the number of processes this AI searches with
+    #  -_parallel: the parallel search mode this AI uses when it has more than one worker
+    #  -_pool: the pool of processes this AI searches with, or None if it searches with only
+    #          one process or has not searched yet
+    #  -_book: the opening book this AI plays from, or None if it does not use one
+    #  -_endgame_threshold: the number of empty cells below which this AI solves the game
+    #  -_delay: the number of seconds this AI waits before making a move with a depth <= 3
+    #  -_solver: the solver this AI uses once few enough empty cells remain, or None if it has
+    #            not been needed yet
+    #  -_last_solution: the result found by the solver on this AI's most recent move, or None
+    #                   if the solver was not used on that move
+    #  -_last_stats: the statistics of the searches made on this AI's most recent move, or None
+    #                if the minimax algorithm was not used on that move
+    #  -_metrics_sink: a function that is called with the statistics of the searches made on
+    #                  each move that uses the minimax algorithm, or None
+    #  -_last_variation: the principal variation found by the last search that finished on this
+    #                    AI's most recent move that used the minimax algorithm (starting with the
+    #                    move made), or [] if it is unknown
+    #  -_last_score: the score found by the last search that finished, or None if it is unknown
+    #  -_expected_hash: the hash of the game state that this AI expects to search next (after
+    #                   its opponent's expected reply), or None if it does not expect one
+    #  -_pondered: maps the hash of each game state that was searched by ponder to the move
+    #              chosen in it, and the values of self._last_solution, self._last_stats,
+    #              self._last_variation, self._expected_hash and self._ordering after choosing it
+    _depth: Optional[int]
+    _time_limit: Optional[float]
+    _table_size: int
+    _tables: dict[str, TranspositionTable]
+    _ordering: MoveOrdering
+    _algorithm: str
+    _workers: int
+    _parallel: str
+    _pool: Optional[Union[RootSplitSearch, LazySMPSearch]]
+    _book: Optional[OpeningBook]
+    _endgame_threshold: int
+    _delay: float
+    _solver: Optional[EndgameSolver]
+    _last_solution: Optional[Solution]
+    _last_stats: Optional[SearchStats]
+    _metrics_sink: Optional[Callable[[SearchStats], None]]
+    _last_variation: list[int]
+    _last_score: Optional[Union[int, float]]
+    _expected_hash: Optional[int]
+    _pondered: dict[int, tuple]
+
+    def __init__(self, depth: Optional[int] = None, table_size: int = 2 ** 18,
+                 time_limit: Optional[float] = None, ordering: str = HISTORY,
+                 workers: int = 1, parallel: str = ROOT_SPLIT,
+                 book: Optional[OpeningBook] = None,
+                 endgame_threshold: int = ENDGAME_THRESHOLD, delay: float = 0.5,
+                 metrics_sink: Optional[Callable[[SearchStats], None]] = None,
+                 algorithm: str = game_tree.ALPHA_BETA) -> None:
+        """Initialize a new MinimaxPlayer that uses the minimax algorithm to the given depth,
+        with transposition tables that hold <table_size> entries. If <table_size> is 0, no
+        transposition tables are used.
+
+        If <time_limit> is not None, the AI uses iterative deepening to choose each move in about
+        <time_limit> seconds, and <depth> is the maximum depth it searches to.
+
+        <ordering> is the move ordering policy this AI uses (see move_ordering.py).
+
+        If <workers> is greater than 1, the AI searches with a pool of <workers> processes in the
+        parallel search mode <parallel>. The pool is started the first time the AI makes a move
+        and is reused for every move after that.
+
+        <book> is the opening book this AI plays from, or None if it does not use one.
+
+        Once there are less than <endgame_threshold> empty cells on the board, the AI solves the
+        game instead of using the minimax algorithm (a threshold of 0 means it never does).
+
+        <delay> is the number of seconds the AI waits before making a move when it searches to a
+        depth <= 3 (see make_move).
+
+        If <metrics_sink> is not None, it is called with the statistics of the searches made on
+        every move that uses the minimax algorithm (see get_last_stats), e.g., to log them.
+
+        <algorithm> is the search algorithm this AI uses (see GameTree.minimax). It is only used
+        when the AI searches with one process.
 
         Preconditions:
-            - depth > 0
+            - depth is not None or time_limit is not None
+            - depth is None or depth > 0
+            - table_size == 0 or table_size >= 2
+            - time_limit is None or time_limit > 0
+            - ordering in {'none', 'centre', 'killer', 'history'}
+            - workers > 0
+            - parallel in {ROOT_SPLIT, LAZY_SMP}
+            - parallel != LAZY_SMP or workers == 1 or table_size >= 2
+            - endgame_threshold >= 0
+            - delay >= 0
+            - algorithm in {game_tree.ALPHA_BETA, game_tree.PVS}
         """
         self._depth = depth
+        self._time_limit = time_limit
+        self._table_size = table_size
+        self._tables = {}
+        self._ordering = MoveOrdering(ordering)
+        self._algorithm = algorithm
+        self._workers = workers
+        self._parallel = parallel
+        self._pool = None
+        self._book = book
+        self._endgame_threshold = endgame_threshold
+        self._delay = delay
+        self._solver = None
+        self._last_solution = None
+        self._last_stats = None
+        self._metrics_sink = metrics_sink
+        self._last_variation = []
+        self._last_score = None
+        self._expected_hash = None
+        self._pondered = {}
+
+    def set_delay(self, delay: float) -> None:
+        """Set the number of seconds this AI waits before making a move with a depth <= 3 to
+        <delay> (see make_move).
 
-    def make_move(self, game: ConnectFourGame, previous_move: Optional[int]) -> int:
+        Preconditions:
+            - delay >= 0
+        """
+        self._delay = delay
+
+    def make_move(self, game: ConnectFourGame, previous_move: Optional[int],
+                  stop: Optional[Any] = None) -> int:
         """Make a move in the given Connect Four game as described in the docstring for this class.
         Return the move that was made.
 
         <previous_move> is the opponent's' most recent move, or None if no moves have been made.
 
-        If the depth of this player <= 3, add a slight delay (0.5 seconds) before the AI makes
-        a move.
+        If <stop> is not None, the AI searches with iterative deepening (even if it has no time
+        limit), and once <stop> is set, it makes the move chosen by the deepest search that
+        finished. Searches by the solver, or by a pool of processes that already started, are
+        not stopped early.
+
+        If the depth of this player <= 3 and it has no time limit, add a slight delay
+        (self._delay seconds, or until <stop> is set) before the AI makes a move that it found
+        with the minimax algorithm.
 
         Preconditions:
             - There is at least one valid move for the given game
         """
+        pondered = self._pondered.get(game.get_hash())
+        self._pondered = {}
+        if pondered is not None:
+            move, self._last_solution, self._last_stats, self._last_variation, \
+                self._expected_hash, self._ordering = pondered
+        else:
+            move = self._choose_move(game, previous_move, stop)
 
-        if self._depth <= 3:
-            time.sleep(0.5)
+        if self._last_stats is not None:
+            if self._time_limit is None and self._depth <= 3 and self._delay > 0:
+                _wait(self._delay, stop)
+            if self._metrics_sink is not None:
+                self._metrics_sink(self._last_stats)
 
-        player = 'Red' if game.is_red_move() else 'Yellow'
-        if previous_move is None:
-            tree = game_tree.GameTree(player, game_tree.ROOT_MOVE, game)
-            move = tree.minimax(self._depth)
+        game.make_move(move)
+        return move
+
+    def ponder(self, replies: dict[int, ConnectFourGame], stop: Any) -> None:
+        """Choose this AI's move for each of the game states its opponent can reach with their
+        next move, while the opponent is thinking. <replies> maps each of the opponent's valid
+        moves to a copy of the game after that move is made. The game states are searched
+        starting with the reply this AI expects (see get_expected_reply), then from the centre
+        column outwards, until every one has been searched or <stop> (e.g., a threading.Event)
+        is set.
+
+        The move chosen for each game state that was fully searched is kept, and is made by
+        make_move without searching again if the opponent makes that reply. The searches also
+        fill this AI's transposition tables, so even a reply that was not fully searched is
+        searched faster by make_move. Each game state is searched with its own copy of this AI's
+        move ordering, so that the killer moves and history that make_move uses are only changed
+        by the search of the reply the opponent actually makes.
+
+        This method is meant to be called in another thread (see pondering.py), and make_move
+        must not be called until it returns. An AI that searches with a pool of processes does
+        not ponder, and the solver cannot be stopped, so a search of a game state with few empty
+        cells left finishes after <stop> is set.
+
+        >>> player = MinimaxPlayer(depth=3, delay=0)
+        >>> game = ConnectFourGame()
+        >>> player.make_move(game, None)
+        3
+        >>> import threading
+        >>> replies = {move: game.copy_and_make_move(move) for move in game.get_valid_moves()}
+        >>> player.ponder(replies, threading.Event())
+        >>> player.make_move(game, user_make_move(game, 3, 2))
+        3
+        """
+        if self._workers > 1:
+            return
+
+        previous = (self._last_solution, self._last_stats, self._last_variation,
+                    self._expected_hash)
+        ordering = self._ordering
+        expected = self.get_expected_reply()
+        cols = next(iter(replies.values())).get_cols()
+        order = MoveOrdering(CENTRE_FIRST, cols).order(list(replies), 0, True,
+                                                       expected if expected in replies else None)
+        try:
+            for reply in order:
+                if stop.is_set():
+                    break
+                if replies[reply].get_winner() is not None:
+                    continue
+
+                self._last_solution, self._last_stats, self._last_variation, \
+                    self._expected_hash = previous
+                self._ordering = ordering.copy()
+                move = self._choose_move(replies[reply], reply, stop)
+                # A move chosen after <stop> was set may not have been searched to full depth
+                if not stop.is_set():
+                    self._pondered[replies[reply].get_hash()] = \
+                        (move, self._last_solution, self._last_stats, self._last_variation,
+                         self._expected_hash, self._ordering)
+        finally:
+            self._last_solution, self._last_stats, self._last_variation, \
+                self._expected_hash = previous
+            self._ordering = ordering
+
+    def _choose_move(self, game: ConnectFourGame, previous_move: Optional[int],
+                     stop: Optional[Any] = None) -> int:
+        """Return the move this AI chooses in the given Connect Four game, as described in the
+        docstring for this class, without making it. self._last_solution, self._last_stats,
+        self._last_variation and self._expected_hash are updated for the move chosen.
+
+        If <stop> is not None, iterative deepening is used, and the move chosen by the deepest
+        search that finished before <stop> was set is returned (see make_move).
+
+        Preconditions:
+            - There is at least one valid move for the given game
+        """
+        self._last_solution, self._last_stats = None, None
+        expected_move = self._get_expected_move(game)
+        self._last_variation, self._expected_hash = [], None
+
+        if self._book is not None:
+            move = self._book.lookup(game)
+            if move is not None:
+                return move
+
+        if game.get_max_moves() - game.get_moves_made() < self._endgame_threshold:
+            if self._solver is None or self._solver.get_cols() != game.get_cols():
+                self._solver = EndgameSolver(self._table_size, game.get_cols())
+            self._last_solution = self._solver.solve(game)
+            return self._last_solution.move
+
+        if self._ordering.get_cols() != game.get_cols():
+            self._ordering = MoveOrdering(self._ordering.policy, game.get_cols())
+
+        # The killer moves of the previous search can only be reused if the opponent replied
+        # with the move that search expected
+        self._ordering.new_search(2 if expected_move is not None else None)
+        self._last_stats = SearchStats()
+
+        if self._time_limit is not None or stop is not None:
+            move = self._iterative_deepening(game, previous_move, expected_move, stop)
         else:
-            tree = game_tree.GameTree(player, previous_move, game)
-            move = tree.minimax(self._depth)
+            move = self._search(game, previous_move, self._depth, first_move=expected_move,
+                                stop=stop)
 
-        game.make_move(move)
+        if self._last_variation[:1] != [move]:
+            self._last_variation = [move]
+        self._expect_reply(game)
         return move
 
+    def get_expected_reply(self) -> Optional[int]:
+        """Return the reply this AI expects its opponent to make to its most recent move, or None
+        if it does not expect one (e.g., it did not use the minimax algorithm on that move).
+
+        >>> player = MinimaxPlayer(depth=3, delay=0)
+        >>> game = ConnectFourGame()
+        >>> player.make_move(game, None)
+        3
+        >>> player.get_expected_reply()
+        2
+        """
+        if len(self._last_variation) < 2:
+            return None
+        return self._last_variation[1]
+
+    def _get_expected_move(self, game: ConnectFourGame) -> Optional[int]:
+        """Return the move that this AI expected to make in the current state of <game> when it
+        made its previous move, or None if the game has not reached the game state it expected.
+        """
+        if self._expected_hash is None or len(self._last_variation) < 3 \
+                or game.get_hash() != self._expected_hash:
+            return None
+        move = self._last_variation[2]
+        return move if game.is_valid_move(move) else None
+
+    def _expect_reply(self, game: ConnectFourGame) -> None:
+        """Record the game state this AI expects to search next, which is reached from the
+        current state of <game> by making the first two moves of self._last_variation.
+
+        <game> is in its original state when this method returns.
+        """
+        if len(self._last_variation) < 3:
+            return
+
+        game.make_move(self._last_variation[0])
+        if game.get_winner() is None and game.is_valid_move(self._last_variation[1]):
+            game.make_move(self._last_variation[1])
+            self._expected_hash = game.get_hash()
+            game.undo_move()
+        game.undo_move()
+
+    def get_last_solution(self) -> Optional[Solution]:
+        """Return the exact result of the game that this AI found on its most recent move (from
+        the perspective of the game state before that move), or None if it used the minimax
+        algorithm or its opening book on that move instead.
+        """
+        return self._last_solution
+
+    def get_last_stats(self) -> Optional[SearchStats]:
+        """Return the statistics of the searches with the minimax algorithm that this AI made on
+        its most recent move, or None if it used its opening book or the solver on that move
+        instead.
+
+        When the AI uses iterative deepening, the statistics of every iteration are added
+        together (including the iteration that ran out of time), and the time of each iteration
+        is in iteration_times. Only the time of each search is recorded for searches made by a
+        pool of processes, as the other statistics stay in the processes that searched.
+
+        >>> player = MinimaxPlayer(depth=2, delay=0)
+        >>> player.make_move(ConnectFourGame(), None)
+        3
+        >>> stats = player.get_last_stats()
+        >>> stats.nodes, len(stats.iteration_times)
+        (15, 1)
+        """
+        return self._last_stats
+
+    def _iterative_deepening(self, game: ConnectFourGame, previous_move: Optional[int],
+                             expected_move: Optional[int] = None,
+                             stop: Optional[Any] = None) -> int:
+        """Return the move chosen by applying the minimax algorithm to depth 1, 2, 3, ... in the
+        given Connect Four game until self._time_limit seconds have passed (if it is not None) or
+        self._depth is reached. The move returned is the one chosen by the deepest search that
+        finished.
+
+        The best move of each search is searched first by the next search. <expected_move> (if it
+        is not None) is searched first by the depth 1 search. The searches also end once <stop>
+        is set, if it is not None.
+
+        If this AI uses principal variation search, each search after the first starts with an
+        aspiration window around the score of the search before it.
+
+        Preconditions:
+            - self._time_limit is not None or stop is not None
+            - There is at least one valid move for the given game
+        """
+        deadline = None
+        if self._time_limit is not None:
+            deadline = time.monotonic() + self._time_limit
+
+        # Searching deeper than the number of moves left in the game gives the same result
+        max_depth = game.get_max_moves() - game.get_moves_made()
+        if self._depth is not None:
+            max_depth = min(max_depth, self._depth)
+
+        # The depth 1 search is always allowed to finish, so that there is a move to make
+        move = self._search(game, previous_move, 1, first_move=expected_move)
+
+        for d in range(2, max_depth + 1):
+            aspiration = self._last_score if self._algorithm == game_tree.PVS else None
+            try:
+                move = self._search(game, previous_move, d, first_move=move, deadline=deadline,
+                                    stop=stop, aspiration=aspiration)
+            except game_tree.SearchTimeout:
+                break
+
+        return move
+
+    def _search(self, game: ConnectFourGame, previous_move: Optional[int], d: int,
+                first_move: Optional[int] = None, deadline: Optional[float] = None,
+                stop: Optional[Any] = None,
+                aspiration: Optional[Union[int, float]] = None) -> int:
+        """Return the move chosen by applying the minimax algorithm to depth <d> in the given
+        Connect Four game, searching <first_move> first if it is not None. The statistics of the
+        search are added to self._last_stats, and if it finishes, its principal variation is
+        stored in self._last_variation and its score in self._last_score.
+
+        <aspiration> is the score the search is expected to find (see GameTree.minimax), or None.
+
+        Raise a game_tree.SearchTimeout if the search is still running at time <deadline> (as
+        returned by time.monotonic), or once <stop> is set if it is not None. A search by a
+        pool of processes only checks <stop> before it starts.
+
+        Preconditions:
+            - d > 0
+            - There is at least one valid move for the given game
+        """
+        player = 'Red' if game.is_red_move() else 'Yellow'
+
+        if self._workers > 1:
+            if self._pool is None and self._parallel == LAZY_SMP:
+                self._pool = LazySMPSearch(self._workers, self._table_size, self._ordering.policy)
+            elif self._pool is None:
+                self._pool = RootSplitSearch(self._workers, self._table_size,
+                                             self._ordering.policy)
+            if stop is not None and stop.is_set():
+                raise game_tree.SearchTimeout
+            start = time.perf_counter()
+            self._last_score = None
+            try:
+                return self._pool.minimax(game, player, d, first_move=first_move,
+                                          deadline=deadline)
+            finally:
+                self._last_stats.iteration_times.append(time.perf_counter() - start)
+
+        root_move = game_tree.ROOT_MOVE if previous_move is None else previous_move
+        tree = game_tree.GameTree(player, root_move, game)
+        try:
+            move = tree.minimax(d, table=self._get_table(player), first_move=first_move,
+                                deadline=deadline, ordering=self._ordering, stop=stop,
+                                algorithm=self._algorithm, aspiration=aspiration)
+        finally:
+            self._last_stats.add(tree.get_stats())
+
+        self._last_variation = tree.get_principal_variation(d)
+        self._last_score = tree.get_score()
+        return move
+
+    def _get_table(self, player: str) -> Optional[TranspositionTable]:
+        """Return the transposition table this AI uses when playing as <player>, or None if this
+        AI does not use transposition tables.
+
+        Preconditions:
+            - player in {'Red', 'Yellow'}
+        """
+        if self._table_size == 0:
+            return None
+        if player not in self._tables:
+            self._tables[player] = TranspositionTable(self._table_size)
+        return self._tables[player]
+
+    def close(self) -> None:
+        """Shut down the pool of processes this AI searches with, if it has one."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+
+def _wait(seconds: float, stop: Optional[Any]) -> None:
+    """Wait <seconds> seconds, or until <stop> is set if it is not None."""
+    if stop is None:
+        time.sleep(seconds)
+    else:
+        stop.wait(seconds)
+
 
 if __name__ == '__main__':
     import python_ta
@@ -139,7 +633,9 @@ if __name__ == '__main__':
     python_ta.contracts.check_all_contracts()
 
     python_ta.check_all(config={
-        'extra-imports': ['python_ta.contracts', 'connect_four', 'game_tree', 'random', 'time'],
+        'extra-imports': ['python_ta.contracts', 'connect_four', 'game_tree', 'random', 'time',
+                          'transposition', 'move_ordering', 'parallel', 'opening_book',
+                          'solver', 'search_stats'],
         'allowed-io': [],
         'max-line-length': 100,
         'disable': ['E1136']
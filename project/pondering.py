@@ -0,0 +1,99 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Pondering
+
+Module Description
+===============================
+This Python module contains the class that lets a MinimaxPlayer think on its opponent's time
+("pondering"). While a user is deciding on their move, the AI searches the game state that each of
+the user's possible moves leads to in a background thread, so that once the user moves, the AI
+usually already knows its reply and can make it immediately.
+
+The search is pure Python, so it shares the interpreter with the thread that runs the game, but
+that thread spends almost all of its time waiting for the user in pygame.event.wait, which lets
+the background thread run.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Optional
+import threading
+from connect_four import ConnectFourGame
+from players import MinimaxPlayer
+
+
+class Ponderer:
+    """Runs MinimaxPlayer.ponder for one AI in a background thread.
+
+    >>> player = MinimaxPlayer(depth=3, delay=0)
+    >>> game = ConnectFourGame()
+    >>> player.make_move(game, None)
+    3
+    >>> ponderer = Ponderer(player)
+    >>> ponderer.start(game)
+    >>> ponderer.stop()
+    >>> ponderer.is_pondering()
+    False
+    """
+    # Private Instance Attributes:
+    #   - _player: the AI that ponders
+    #   - _thread: the thread the AI is pondering in, or None if it is not pondering
+    #   - _stop: the event that tells the AI to stop pondering
+    _player: MinimaxPlayer
+    _thread: Optional[threading.Thread]
+    _stop: threading.Event
+
+    def __init__(self, player: MinimaxPlayer) -> None:
+        """Initialize a new Ponderer for <player>, which is not pondering yet."""
+        self._player = player
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, game: ConnectFourGame) -> None:
+        """Start pondering in a background thread on the game states that the opponent of the AI
+        can reach with their next move in the current state of <game>. Stop pondering on any
+        earlier game state first.
+
+        Each reply is made in its own copy of <game>, so <game> can be changed while the AI
+        ponders, but the AI must not make a move until stop has been called.
+
+        Preconditions:
+            - it is the turn of the AI's opponent in <game>
+        """
+        self.stop()
+        if game.get_winner() is not None:
+            return
+
+        replies = {move: game.copy_and_make_move(move) for move in game.get_valid_moves()}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._player.ponder, args=(replies, self._stop),
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop pondering, and wait for the background thread to finish. The moves the AI
+        finished choosing before it was stopped are kept (see MinimaxPlayer.ponder)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def is_pondering(self) -> bool:
+        """Return whether the AI is still pondering in the background thread."""
+        return self._thread is not None and self._thread.is_alive()
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'threading', 'connect_four', 'players'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
@@ -9,32 +9,56 @@ Copyright Information
 ===============================
 This file is Copyright (c) 2021 Anis Singh.
 """
+from typing import Optional
 import pygame
-import plotly.graph_objects as go
 import visualizer as v
 import players as p
+from tournament import plot_game_statistics
+from pondering import Ponderer
+from background import BackgroundMove
 from connect_four import ConnectFourGame
 
+# Global Constants
+# The number of times per second the window is redrawn while an AI is choosing a move
+FRAMES_PER_SECOND = 60
 
-def run_game(d: int = 5, red_starts: bool = True) -> None:
+
+def run_game(d: int = 5, red_starts: bool = True, time_limit: Optional[float] = None,
+             ponder: bool = True) -> None:
     """Run a Connect Four Game between a user and a Minimax AI. The user player is always red and
     the AI player is always yellow.
 
     The depth that the AI uses the minimax algorithm to is determined by <d>. Whether or
     not the user starts is determined by <red_starts>.
 
+    If <time_limit> is not None, the AI instead takes about <time_limit> seconds per move,
+    searching as deep as it can in that time (up to depth <d>).
+
+    If <ponder> is True, the AI searches the user's possible moves while the user is thinking
+    (see pondering.py), so it can usually reply as soon as the user has moved.
+
     Preconditions:
         - d > 0
+        - time_limit is None or time_limit > 0
         - must be on a monitor that is at least 840 x 840
 
-    Note: Calling this function with d >= 6 is not recommended, as the AI begins to take a long
-    time to make a move.
+    The AI chooses its moves in a background thread (see background.py), so the window keeps
+    responding while it thinks, and can be closed at any time.
+
+    Note: Calling this function with d >= 6 and no time limit is not recommended, as the AI begins
+    to take a long time to make a move.
     """
     game, screen = _setup_game([pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION], red_starts)
-    ai_player = p.MinimaxPlayer(depth=d)
+    ai_player = p.MinimaxPlayer(depth=d, time_limit=time_limit)
+    ponderer = Ponderer(ai_player) if ponder else None
+    ai_move = None
+    clock = pygame.time.Clock()
     user_quit = False
     previous_move = None
 
+    if ponderer is not None and game.is_red_move():
+        ponderer.start(game)
+
     # Main game loop
     while game.get_winner() is None:
 
@@ -61,10 +85,30 @@ def run_game(d: int = 5, red_starts: bool = True) -> None:
 
         # AI's turn
         else:
-            previous_move = ai_player.make_move(game, previous_move)
-            # Draw phantom circle for red in the centre so they know the AI has made its move
-            v.draw_phantom_circle(game, screen.get_width() // 2, screen)
+            if ai_move is None:
+                if ponderer is not None:
+                    ponderer.stop()
+                ai_move = BackgroundMove(ai_player, game, previous_move)
+
+            # Keep handling events while the AI is thinking
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                ai_move.stop()
+                user_quit = True
+                break
 
+            if ai_move.is_done():
+                previous_move = ai_move.wait()
+                game.make_move(previous_move)
+                ai_move = None
+                if ponderer is not None:
+                    ponderer.start(game)
+                # Draw phantom circle for red in the centre so they know the AI has made its move
+                v.draw_phantom_circle(game, screen.get_width() // 2, screen)
+            else:
+                clock.tick(FRAMES_PER_SECOND)
+
+    if ponderer is not None:
+        ponderer.stop()
     v.update_game_end(game, screen, user_quit)
 
 
@@ -80,6 +124,9 @@ def run_games_ai(n: int, d: int = 5, rand_starts: bool = False) -> None:
     Should the user exit the pygame window before all <n> games are played, display only the
     statistics of the games that were fully completed.
 
+    Every game is drawn as it is played, so this is slow for large <n>; use
+    tournament.run_tournament to play many games without a window.
+
     Preconditions:
         - n > 0
         - d > 0
@@ -118,8 +165,8 @@ def run_games_ai(n: int, d: int = 5, rand_starts: bool = False) -> None:
     print(f'Random AI won: {opponent_wins} games.')
     print(f'{draws} games ended in a draw.')
 
-    _plot_game_statistics(opponent_wins, minimax_ai_wins, draws, 'Random AI Wins',
-                          f'Minimax Depth {d} AI Wins')
+    plot_game_statistics(opponent_wins, minimax_ai_wins, draws, 'Random AI Wins',
+                         f'Minimax Depth {d} AI Wins')
 
     if winner != 'QUIT':
         # Wait for the user to quit
@@ -166,26 +213,36 @@ def _run_ai_game(screen: pygame.Surface, game: ConnectFourGame, minimax_ai: p.Mi
                  opponent: p.RandomPlayer) -> str:
     """Run a visual game between a Minimax AI player and a Random AI player and return the winner.
     If the window is closed before the game is over, stop running the game and return 'QUIT'.
+
+    Each move is chosen in a background thread (see background.py), so the window keeps
+    responding while the AIs think.
     """
     user_quit = False
     previous_move = None
+    ai_move = None
+    clock = pygame.time.Clock()
     while game.get_winner() is None:
 
-        if user_quit:
-            break
-
         v.draw_game_state(game, screen)
         pygame.display.flip()
 
-        for _ in pygame.event.get(pygame.QUIT):
+        if ai_move is None:
+            player = opponent if game.is_red_move() else minimax_ai
+            ai_move = BackgroundMove(player, game, previous_move)
+
+        if pygame.event.get(pygame.QUIT) != []:
+            ai_move.stop()
             pygame.display.quit()
             pygame.quit()
             user_quit = True
+            break
 
-        if game.is_red_move():
-            previous_move = opponent.make_move(game, previous_move)
+        if ai_move.is_done():
+            previous_move = ai_move.wait()
+            game.make_move(previous_move)
+            ai_move = None
         else:
-            previous_move = minimax_ai.make_move(game, previous_move)
+            clock.tick(FRAMES_PER_SECOND)
 
     if user_quit:
         return 'QUIT'
@@ -202,25 +259,6 @@ def _run_ai_game(screen: pygame.Surface, game: ConnectFourGame, minimax_ai: p.Mi
         return game.get_winner()
 
 
-def _plot_game_statistics(red_wins: int, yellow_wins: int, draws: int,
-                          red_wins_title: str = 'Red Wins',
-                          yellow_wins_title: str = 'Yellow Wins') -> None:
-    """Visually display the results of a sequence of Connect Four games."""
-
-    # Create the figure object
-    fig = go.Figure(data=[
-        go.Bar(name=red_wins_title, x=[red_wins_title], y=[red_wins]),
-        go.Bar(name=yellow_wins_title, x=[yellow_wins_title], y=[yellow_wins]),
-        go.Bar(name='Draws', x=['Draws'], y=[draws])
-    ])
-
-    # Add titles
-    fig.update_layout(title='Connect Four Game Results', xaxis_title='Outcome')
-
-    # Display the figure
-    fig.show()
-
-
 def _setup_game(allowed_events: list, red_starts: bool = True) -> (ConnectFourGame, pygame.Surface):
     """Set up and initialize a pygame screen and a generic Connect Four game where
     the starting player is determined by <red_starts>. The only allowed pygame
@@ -248,8 +286,8 @@ if __name__ == '__main__':
     python_ta.contracts.check_all_contracts()
 
     python_ta.check_all(config={
-        'extra-imports': ['python_ta.contracts', 'visualizer', 'players', 'plotly.graph_objects',
-                          'pygame', 'connect_four'],
+        'extra-imports': ['python_ta.contracts', 'visualizer', 'players', 'tournament', 'pygame',
+                          'connect_four', 'pondering', 'background'],
         'allowed-io': ['run_games_ai'],
         'max-line-length': 100,
         'disable': [],
@@ -0,0 +1,138 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Search Statistics
+
+Module Description
+===============================
+This Python module contains the class that records statistics about searches with the minimax
+algorithm, such as how many game states were searched, how often alpha-beta pruning cut the search
+off, and how long the search took. These statistics explain why a search was slow: for example, a
+low first-move cutoff ratio means the move ordering is poor, and a low number of transposition
+table hits means the table is too small or is being overwritten.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from __future__ import annotations
+
+
+class SearchStats:
+    """Statistics about one or more searches with the minimax algorithm.
+
+    Instance Attributes:
+        - nodes: the number of game states searched
+        - leaves: the number of game states that were scored without searching the game states
+                  after them (because the search reached its depth, or the game was over)
+        - cutoffs: the number of game states whose remaining moves were pruned by alpha-beta
+                   pruning
+        - first_move_cutoffs: the number of cutoffs that were caused by the first move searched
+        - nodes_per_ply: the number of game states searched at each ply (depth of the game tree,
+                         starting from 0 at the root)
+        - table_probes: the number of times a game state was looked up in the transposition table
+        - table_hits: the number of lookups that found an entry for the game state
+        - iteration_times: the number of seconds taken by each search (e.g., each iteration of
+                           iterative deepening) that these statistics cover
+
+    Representation Invariants:
+        - self.first_move_cutoffs <= self.cutoffs <= self.nodes
+        - self.leaves <= self.nodes
+        - sum(self.nodes_per_ply) == self.nodes
+        - self.table_hits <= self.table_probes
+
+    >>> stats = SearchStats(depth=2)
+    >>> stats.nodes, stats.nodes_per_ply = 57, [1, 7, 49]
+    >>> stats.cutoffs, stats.first_move_cutoffs = 4, 3
+    >>> stats.get_branching_factors()
+    [7.0, 7.0]
+    >>> stats.get_first_move_cutoff_ratio()
+    0.75
+    """
+    nodes: int
+    leaves: int
+    cutoffs: int
+    first_move_cutoffs: int
+    nodes_per_ply: list[int]
+    table_probes: int
+    table_hits: int
+    iteration_times: list[float]
+
+    def __init__(self, depth: int = 0) -> None:
+        """Initialize new, empty statistics for a search to depth <depth>.
+
+        Preconditions:
+            - depth >= 0
+        """
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.nodes_per_ply = [0] * (depth + 1)
+        self.table_probes = 0
+        self.table_hits = 0
+        self.iteration_times = []
+
+    def get_first_move_cutoff_ratio(self) -> float:
+        """Return the fraction of cutoffs that were caused by the first move searched, or 0.0 if
+        there were no cutoffs. The closer this is to 1, the better the move ordering."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs > 0 else 0.0
+
+    def get_branching_factors(self) -> list[float]:
+        """Return the average number of game states searched after each game state at each ply,
+        i.e., the number of game states searched at ply i + 1 divided by the number searched at
+        ply i, for every ply i that had game states searched after it."""
+        factors = []
+        for ply in range(0, len(self.nodes_per_ply) - 1):
+            if self.nodes_per_ply[ply] > 0 and self.nodes_per_ply[ply + 1] > 0:
+                factors.append(self.nodes_per_ply[ply + 1] / self.nodes_per_ply[ply])
+        return factors
+
+    def get_seconds(self) -> float:
+        """Return the total number of seconds taken by the searches these statistics cover."""
+        return sum(self.iteration_times)
+
+    def get_nodes_per_second(self) -> float:
+        """Return the number of game states searched per second, or 0.0 if no time was taken."""
+        seconds = self.get_seconds()
+        return self.nodes / seconds if seconds > 0 else 0.0
+
+    def add(self, other: SearchStats) -> None:
+        """Add the statistics of <other> to these statistics, as if the search of <other> was
+        another iteration of the searches these statistics cover."""
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        for ply, nodes in enumerate(other.nodes_per_ply):
+            if ply < len(self.nodes_per_ply):
+                self.nodes_per_ply[ply] += nodes
+            else:
+                self.nodes_per_ply.append(nodes)
+        self.table_probes += other.table_probes
+        self.table_hits += other.table_hits
+        self.iteration_times.extend(other.iteration_times)
+
+    def to_dict(self) -> dict:
+        """Return these statistics as a dictionary that can be converted to JSON (e.g., to send
+        them to a metrics sink)."""
+        return {'nodes': self.nodes, 'leaves': self.leaves, 'cutoffs': self.cutoffs,
+                'first_move_cutoff_ratio': self.get_first_move_cutoff_ratio(),
+                'branching_factors': self.get_branching_factors(),
+                'table_probes': self.table_probes, 'table_hits': self.table_hits,
+                'iteration_times': self.iteration_times, 'seconds': self.get_seconds(),
+                'nodes_per_second': self.get_nodes_per_second()}
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
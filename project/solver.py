@@ -0,0 +1,271 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Endgame Solver
+
+Module Description
+===============================
+This Python module contains the solver that finds the exact result of a game state (whether the
+current player wins, loses or draws with perfect play, and how many moves it takes) by searching
+every game state after it until the end of the game. Unlike the minimax algorithm in game_tree.py,
+no heuristic is used, so the solver never misplays, but it is only fast enough once few empty
+cells remain on the board.
+
+Scores are from the perspective of the current player (negamax). A draw has a score of 0, and a
+game that is won with the <n>th piece placed on the board has a score of
+get_max_moves() + 1 - <n> for the winner (and the negative of that for the loser), so faster wins
+and slower losses have higher scores.
+
+The exact score is found by a series of null-window searches (searches whose alpha-beta window
+is only one score wide), each of which only needs to prove whether the score is above or below a
+single value. Each search narrows the range that the score can be in, until only one score is
+left. The results of every search are kept in a transposition table, so later searches (and
+searches from later game states) only need to search the game states whose bounds are not tight
+enough.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Optional
+from connect_four import ConnectFourGame
+from move_ordering import MoveOrdering, CENTRE_FIRST
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Global Constants
+# The number of empty cells below which a MinimaxPlayer solves the game instead of searching
+ENDGAME_THRESHOLD = 16
+
+
+class Solution:
+    """The exact result of a game state, as found by an EndgameSolver.
+
+    Instance Attributes:
+        - score: the score of the game state for the current player, as described in the module
+                 description
+        - winner: the player who wins with perfect play ('Red' or 'Yellow'), or None if the game
+                  ends in a draw
+        - moves_to_win: the number of moves (by either player, including the winning move) until
+                        the winner wins with perfect play, or None if the game ends in a draw
+        - move: a best move for the current player
+
+    Representation Invariants:
+        - (self.winner is None) == (self.moves_to_win is None) == (self.score == 0)
+        - self.moves_to_win is None or self.moves_to_win > 0
+    """
+    score: int
+    winner: Optional[str]
+    moves_to_win: Optional[int]
+    move: int
+
+    def __init__(self, game: ConnectFourGame, score: int, move: int) -> None:
+        """Initialize the solution for the current state of <game>, which has score <score> and
+        a best move <move>."""
+        self.score = score
+        self.move = move
+
+        if score == 0:
+            self.winner, self.moves_to_win = None, None
+        else:
+            current, other = ('Red', 'Yellow') if game.is_red_move() else ('Yellow', 'Red')
+            self.winner = current if score > 0 else other
+            self.moves_to_win = game.get_max_moves() + 1 - abs(score) - game.get_moves_made()
+
+
+class EndgameSolver:
+    """A solver that finds the exact result of game states.
+
+    The solver keeps the results of its searches in a transposition table, so the same solver
+    should be used for every game state of a game (the results are the same for both players, so
+    one solver can be shared by them).
+
+    >>> game = ConnectFourGame()
+    >>> for move in [1, 5, 4, 2, 3, 2, 0, 6, 2, 3, 1, 5, 4, 4, 1,
+    ...              1, 0, 0, 2, 5, 5, 1, 4, 2, 4, 1, 4, 0, 0, 2]:
+    ...     game.make_move(move)
+    >>> solution = EndgameSolver().solve(game)
+    >>> solution.winner
+    'Yellow'
+    >>> solution.moves_to_win
+    10
+    >>> solution.score
+    -3
+
+    A move that fills the board without connecting four pieces is a draw, not a win:
+
+    >>> game = ConnectFourGame()
+    >>> for move in [4, 3, 2, 1, 4, 2, 2, 0, 2, 0, 0, 1, 5, 0, 0, 4, 5,
+    ...              2, 6, 0, 3, 6, 4, 2, 6, 4, 1, 1, 1, 4, 6, 6, 6]:
+    ...     game.make_move(move)
+    >>> solution = EndgameSolver().solve(game)
+    >>> (solution.score, solution.winner, solution.moves_to_win)
+    (0, None, None)
+    """
+    # Private Instance Attributes:
+    #   - _table: the transposition table that stores the bounds on the score of each game state
+    #             that has been searched, or None if the solver does not use one
+    #   - _cols: the number of columns of the board of the game states this solver solves
+    #   - _order: every column, in the order they are searched
+    _table: Optional[TranspositionTable]
+    _cols: int
+    _order: list[int]
+
+    def __init__(self, table_size: int = 2 ** 20, cols: int = 7) -> None:
+        """Initialize a new EndgameSolver for a board with <cols> columns, with a transposition
+        table that holds <table_size> entries (or no transposition table if <table_size> is 0).
+
+        Preconditions:
+            - table_size == 0 or table_size >= 2
+            - cols > 0
+        """
+        self._table = TranspositionTable(table_size) if table_size > 0 else None
+        self._cols = cols
+        self._order = MoveOrdering(CENTRE_FIRST, cols).order(list(range(cols)), 0, True)
+
+    def get_cols(self) -> int:
+        """Return the number of columns of the board of the game states this solver solves."""
+        return self._cols
+
+    def solve(self, game: ConnectFourGame) -> Solution:
+        """Return the exact result of the current state of <game>.
+
+        <game> is in its original state when this method returns.
+
+        Preconditions:
+            - game.get_winner() is None
+            - game.get_valid_moves() != []
+            - game.get_cols() == self.get_cols()
+        """
+        remaining = game.get_max_moves() - game.get_moves_made()
+
+        # Narrow the range the score can be in with null-window searches. Each search is centred
+        # towards 0 first, as most game states are close to being a draw.
+        low, high = -remaining, remaining
+        while low < high:
+            middle = low + (high - low) // 2
+            if middle <= 0 and low // 2 < middle:
+                middle = low // 2
+            elif middle >= 0 and high // 2 > middle:
+                middle = high // 2
+
+            score = self._negamax(game, middle, middle + 1)
+            if score <= middle:
+                high = score
+            else:
+                low = score
+
+        return Solution(game, low, self._find_move(game, low))
+
+    def _find_move(self, game: ConnectFourGame, score: int) -> int:
+        """Return a move in the current state of <game> that leads to a score of <score> for the
+        current player.
+
+        Preconditions:
+            - <score> is the exact score of the current state of <game>
+        """
+        remaining = game.get_max_moves() - game.get_moves_made()
+        moves = game.get_valid_moves()
+        for move in self._order:
+            if move in moves:
+                game.make_move(move)
+                try:
+                    winner = game.get_winner()
+                    if winner == 'Draw':
+                        move_score = 0
+                    elif winner is not None:
+                        move_score = remaining
+                    else:
+                        # A null-window search only proves that the move is at least this good
+                        move_score = -self._negamax(game, -score, -score + 1)
+                finally:
+                    game.undo_move()
+
+                if move_score >= score:
+                    return move
+
+        # The score of the game state is the score of one of its moves
+        assert False
+
+    def _negamax(self, game: ConnectFourGame, alpha: int, beta: int) -> int:
+        """Return the score of the current state of <game> if it is strictly between <alpha> and
+        <beta>. Otherwise, return an upper bound on the score that is <= <alpha>, or a lower bound
+        on the score that is >= <beta>.
+
+        <game> is in its original state when this method returns.
+
+        Preconditions:
+            - game.get_winner() is None
+            - alpha < beta
+        """
+        moves = game.get_valid_moves()
+        if moves == []:
+            return 0
+
+        remaining = game.get_max_moves() - game.get_moves_made()
+
+        # Win immediately if possible (a move that fills the board without winning is a draw)
+        for move in moves:
+            game.make_move(move)
+            won = game.get_winner() not in {None, 'Draw'}
+            game.undo_move()
+            if won:
+                return remaining
+
+        # Otherwise, the earliest the current player can win is with their next move
+        beta = min(beta, max(remaining - 2, 0))
+        if alpha >= beta:
+            return beta
+
+        # A game state and its mirror image have the same score, so they share an entry
+        key = game.get_canonical_hash()
+        if self._table is not None:
+            entry = self._table.probe(key)
+            if entry is not None:
+                _, flag, table_score, _ = entry
+                table_score = int(table_score)
+                if flag == EXACT:
+                    return table_score
+                elif flag == LOWER_BOUND:
+                    alpha = max(alpha, table_score)
+                else:
+                    beta = min(beta, table_score)
+
+                if alpha >= beta:
+                    return table_score
+
+        alpha_original = alpha
+        for move in self._order:
+            if move in moves:
+                game.make_move(move)
+                try:
+                    score = -self._negamax(game, -beta, -alpha)
+                finally:
+                    game.undo_move()
+
+                if score >= beta:
+                    if self._table is not None:
+                        self._table.store(key, 0, LOWER_BOUND, score,
+                                          move if key == game.get_hash()
+                                          else game.get_cols() - 1 - move)
+                    return score
+                alpha = max(alpha, score)
+
+        if self._table is not None:
+            self._table.store(key, 0, EXACT if alpha > alpha_original else UPPER_BOUND, alpha,
+                              None)
+        return alpha
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'connect_four', 'move_ordering',
+                          'transposition'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
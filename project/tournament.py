@@ -0,0 +1,211 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Tournaments
+
+Module Description
+===============================
+This Python module contains the functions that run tournaments between two Connect Four AIs: a
+number of games between them, played without a pygame window and spread over a pool of
+processes, so that many games can be played quickly. The two AIs take turns playing as red (who
+always moves first), and the random number generator is seeded differently for each game, so that
+the games are different but can be replayed. The AIs never wait before making their moves.
+
+The result of each game is written to a JSON Lines file (one JSON object per line) as soon as the
+game is finished. The results can then be summarized with plot_results.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+import copy
+import json
+import pickle
+import random
+import time
+from connect_four import ConnectFourGame
+from players import PlayerAI
+
+# The state of each process in a tournament pool: the two AIs playing in the tournament (as they
+# are before playing any games), and the size of the board they play on, in the form
+# (rows, cols, connect)
+_worker_players = ()
+_worker_size = (6, 7, 4)
+
+
+def run_tournament(player1: PlayerAI, player2: PlayerAI, n: int, path: str,
+                   workers: Optional[int] = None, seed: int = 0, rows: int = 6, cols: int = 7,
+                   connect: int = 4) -> dict[str, int]:
+    """Play <n> games between <player1> and <player2> on a pool of <workers> processes (or one
+    process per CPU if <workers> is None), and write the result of each game to the JSON Lines
+    file at <path>. Return the number of games won by each AI and the number of draws, in the
+    form {'player1': wins, 'player2': wins, 'draws': draws}.
+
+    The games are played on a board with <rows> rows and <cols> columns, where <connect> pieces in
+    a row are needed to win.
+
+    <player1> plays as red in the even-numbered games (starting from game 0), and <player2> plays
+    as red in the odd-numbered games. Before game i is played, the random number generator is
+    seeded with <seed> + i.
+
+    Every game is played by new copies of <player1> and <player2>, so nothing an AI learns in one
+    game (e.g., the contents of its transposition tables) carries over to another, and game i can
+    be replayed from <seed> + i alone (unless an AI has a time limit, since how deep it searches
+    then depends on how fast the process runs). The delay of the copies is set to 0, so that
+    they do not wait before making their moves.
+
+    The results are written in the order the games finish, and each one is a JSON object of the
+    form {"game": i, "seed": seed, "red": name, "yellow": name, "winner": name or null,
+    "moves": [...], "seconds": time taken}, where name is "player1" or "player2".
+
+    Raise a ValueError if <player1> or <player2> cannot be pickled (e.g., an AI with a
+    metrics_sink that is a lambda), since the AIs are sent to the processes of the pool.
+
+    Preconditions:
+        - n > 0
+        - workers is None or workers > 0
+        - rows > 0 and cols > 0
+        - 2 <= connect <= max(rows, cols)
+
+    >>> import os
+    >>> import tempfile
+    >>> from players import RandomPlayer
+    >>> path = os.path.join(tempfile.mkdtemp(), 'results.jsonl')
+    >>> results = run_tournament(RandomPlayer(), RandomPlayer(), 4, path, workers=2)
+    >>> sum(results.values())
+    4
+    >>> with open(path) as file:
+    ...     sorted(json.loads(line)['game'] for line in file)
+    [0, 1, 2, 3]
+    >>> from players import MinimaxPlayer
+    >>> def read_moves(path: str) -> dict[int, list[int]]:
+    ...     with open(path) as file:
+    ...         return {result['game']: result['moves'] for result in map(json.loads, file)}
+    >>> _ = run_tournament(MinimaxPlayer(4), RandomPlayer(), 4, path, workers=1)
+    >>> moves = read_moves(path)
+    >>> _ = run_tournament(MinimaxPlayer(4), RandomPlayer(), 4, path, workers=2)
+    >>> read_moves(path) == moves
+    True
+    >>> from opening_book import OpeningBook, build_book
+    >>> book_path = os.path.join(tempfile.mkdtemp(), 'book.bin')
+    >>> build_book(book_path, plies=2, depth=2)
+    10
+    >>> results = run_tournament(MinimaxPlayer(2, book=OpeningBook(book_path)), RandomPlayer(), 2,
+    ...                          path, workers=2)
+    >>> sum(results.values())
+    2
+    >>> run_tournament(MinimaxPlayer(2, metrics_sink=lambda stats: None), RandomPlayer(), 2, path)
+    Traceback (most recent call last):
+    ValueError: player1 cannot be pickled, so it cannot play in a tournament
+    """
+    for name, player in (('player1', player1), ('player2', player2)):
+        try:
+            pickle.dumps(player)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            raise ValueError(f'{name} cannot be pickled, so it cannot play in a tournament')
+
+    results = {'player1': 0, 'player2': 0, 'draws': 0}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker,
+                             initargs=(player1, player2, (rows, cols, connect))) as executor, \
+            open(path, 'w') as file:
+        futures = [executor.submit(_play_game, i, seed + i) for i in range(0, n)]
+
+        for future in as_completed(futures):
+            result = future.result()
+            file.write(json.dumps(result) + '\n')
+            file.flush()
+
+            if result['winner'] is None:
+                results['draws'] += 1
+            else:
+                results[result['winner']] += 1
+
+    return results
+
+
+def plot_results(path: str, player1_title: str = 'Player 1 Wins',
+                 player2_title: str = 'Player 2 Wins') -> None:
+    """Visually display the results of the tournament stored in the JSON Lines file at <path>
+    (as written by run_tournament), with plotly.
+
+    plotly is only imported when this function is called, so that tournaments can be run without
+    it.
+    """
+    wins = {'player1': 0, 'player2': 0}
+    draws = 0
+    with open(path) as file:
+        for line in file:
+            winner = json.loads(line)['winner']
+            if winner is None:
+                draws += 1
+            else:
+                wins[winner] += 1
+
+    plot_game_statistics(wins['player1'], wins['player2'], draws, player1_title, player2_title)
+
+
+def plot_game_statistics(red_wins: int, yellow_wins: int, draws: int,
+                         red_wins_title: str = 'Red Wins',
+                         yellow_wins_title: str = 'Yellow Wins') -> None:
+    """Visually display the results of a sequence of Connect Four games."""
+    import plotly.graph_objects as go
+
+    # Create the figure object
+    fig = go.Figure(data=[
+        go.Bar(name=red_wins_title, x=[red_wins_title], y=[red_wins]),
+        go.Bar(name=yellow_wins_title, x=[yellow_wins_title], y=[yellow_wins]),
+        go.Bar(name='Draws', x=['Draws'], y=[draws])
+    ])
+
+    # Add titles
+    fig.update_layout(title='Connect Four Game Results', xaxis_title='Outcome')
+
+    # Display the figure
+    fig.show()
+
+
+def _initialize_worker(player1: PlayerAI, player2: PlayerAI, size: tuple[int, int, int]) -> None:
+    """Initialize the state of a process in a tournament pool."""
+    global _worker_players, _worker_size
+    player1.set_delay(0)
+    player2.set_delay(0)
+    _worker_players, _worker_size = (player1, player2), size
+
+
+def _play_game(i: int, seed: int) -> dict:
+    """Play game <i> of a tournament between new copies of the AIs of this process, after seeding
+    the random number generator with <seed>, and return its result as described in run_tournament.
+    """
+    random.seed(seed)
+    red, yellow = ('player1', 'player2') if i % 2 == 0 else ('player2', 'player1')
+    player1, player2 = copy.deepcopy(_worker_players)
+    players = {'player1': player1, 'player2': player2}
+
+    game = ConnectFourGame(True, *_worker_size)
+    previous_move = None
+    start = time.perf_counter()
+    while game.get_winner() is None:
+        player = players[red] if game.is_red_move() else players[yellow]
+        previous_move = player.make_move(game, previous_move)
+
+    winner = {'Red': red, 'Yellow': yellow}.get(game.get_winner())
+    return {'game': i, 'seed': seed, 'red': red, 'yellow': yellow, 'winner': winner,
+            'moves': game.get_move_history(), 'seconds': time.perf_counter() - start}
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'concurrent.futures', 'copy', 'json', 'pickle',
+                          'random', 'time', 'connect_four', 'players', 'plotly.graph_objects'],
+        'allowed-io': ['run_tournament', 'plot_results'],
+        'max-line-length': 100,
+        'disable': ['E1136', 'W0603', 'C0415']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
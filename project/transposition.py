@@ -0,0 +1,217 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Transposition Table
+
+Module Description
+===============================
+This Python module contains the transposition table that is used by the minimax algorithm to
+remember the results of searching game states it has already seen. In Connect Four, the same game
+state can be reached by many different orders of moves (e.g., playing 3, 4, 2 results in the same
+board as playing 2, 4, 3), so remembering these results saves the minimax algorithm from searching
+the same game state over and over again.
+
+A transposition table can also be stored in a buffer of memory that is shared between processes
+(e.g., a multiprocessing.shared_memory.SharedMemory), so that several searches running at once can
+all read and write the same table. No locks are used: two processes writing the same entry at
+once can leave it with a mix of both of their writes, so each entry stores its key XORed with its
+contents, and an entry whose contents don't match its key is treated as missing.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Any, Optional, Union
+import struct
+import numpy as np
+
+# Global Constants
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+ALWAYS_REPLACE = 'always-replace'
+DEPTH_PREFERRED = 'depth-preferred'
+TWO_TIER = 'two-tier'
+
+NO_MOVE = -1
+
+# Each entry of a transposition table is stored as three 64-bit words: the key of the entry XORed
+# with the other two words, the bits of the score, and the depth, flag, move and whether the entry
+# is used, packed into one word (see _pack_info)
+_ENTRY_WORDS = 3
+_WORD_BYTES = 8
+_USED_BIT = 1 << 24
+
+# Convert between a word and the float whose bits it holds
+_WORD = struct.Struct('Q')
+_FLOAT = struct.Struct('d')
+
+
+class TranspositionTable:
+    """A fixed-size table that maps the hashes of game states to the results of searching them
+    with the minimax algorithm.
+
+    Each entry stores the depth that the game state was searched to, whether the stored score is
+    the exact score of the game state or only a lower or upper bound on it (because of alpha-beta
+    pruning), the score itself, and the best move that was found.
+
+    The table never grows. When two game states map to the same place in the table, the
+    replacement policy decides which one is kept:
+        - ALWAYS_REPLACE: the most recently stored game state is kept
+        - DEPTH_PREFERRED: the game state that was searched to the greater depth is kept
+        - TWO_TIER: each place in the table holds two entries, one that is depth-preferred, and
+                    one that is always replaced by game states that don't fit in the first one
+
+    Scores are stored from the perspective of a single player, so a table should only be shared
+    between searches from the same player's perspective.
+
+    Representation Invariants:
+        - self.policy in {ALWAYS_REPLACE, DEPTH_PREFERRED, TWO_TIER}
+
+    >>> table = TranspositionTable(size=8)
+    >>> table.probe(12345) is None
+    True
+    >>> table.store(12345, depth=4, flag=EXACT, score=10, move=3)
+    >>> table.probe(12345)
+    (4, 0, 10.0, 3)
+    >>> table.store(12345, depth=2, flag=LOWER_BOUND, score=25, move=2)
+    >>> table.probe(12345)
+    (4, 0, 10.0, 3)
+    >>> shared = TranspositionTable(size=8, buffer=bytearray(get_buffer_size(8)))
+    >>> shared.store(12345, depth=4, flag=EXACT, score=10, move=3)
+    >>> shared.probe(12345)
+    (4, 0, 10.0, 3)
+    """
+    policy: str
+
+    # Private Instance Attributes:
+    #   - _array: the words of the entries of this table
+    #   - _words: the words of the entries of this table, as unsigned integers (reading a single
+    #             word through a memoryview is much faster than through a numpy array)
+    #   - _scores: the words of the entries of this table, as floats
+    #   - _slots: the number of entries in each place (bucket) of this table
+    #   - _buckets: the number of places in this table that a game state can map to
+    _array: np.ndarray
+    _words: memoryview
+    _scores: memoryview
+    _slots: int
+    _buckets: int
+
+    def __init__(self, size: int = 2 ** 18, policy: str = TWO_TIER,
+                 buffer: Optional[Any] = None) -> None:
+        """Initialize a new transposition table that can hold <size> entries, and that replaces
+        entries according to <policy>.
+
+        If <buffer> is None, the table is empty. Otherwise, the entries of the table are stored in
+        <buffer> (e.g., the buf of a multiprocessing.shared_memory.SharedMemory), which must be
+        zeroed or already hold a table with the same size and policy; the entries already in
+        <buffer> are kept.
+
+        Preconditions:
+            - size >= 2
+            - policy in {ALWAYS_REPLACE, DEPTH_PREFERRED, TWO_TIER}
+            - buffer is None or len(buffer) >= get_buffer_size(size)
+        """
+        self.policy = policy
+        self._slots = 2 if policy == TWO_TIER else 1
+        self._buckets = size // self._slots
+        words = self._buckets * self._slots * _ENTRY_WORDS
+        if buffer is None:
+            self._array = np.zeros(words, dtype=np.uint64)
+        else:
+            self._array = np.ndarray(words, dtype=np.uint64, buffer=buffer)
+        self._words = memoryview(self._array).cast('B').cast('Q')
+        self._scores = memoryview(self._array).cast('B').cast('d')
+
+    def probe(self, key: int) -> Optional[tuple[int, int, float, Optional[int]]]:
+        """Return the entry stored for the game state with hash <key> as a tuple of the form
+        (depth, flag, score, move), or None if there is no entry for that game state.
+
+        move is None if no best move was stored for the game state.
+        """
+        words = self._words
+        start = (key % self._buckets) * self._slots * _ENTRY_WORDS
+        for index in range(start, start + self._slots * _ENTRY_WORDS, _ENTRY_WORDS):
+            # Each word is read once, and the entry is decoded from the words that were checked
+            # against its key, since another process may change the entry after the check
+            info = words[index + 2]
+            if info & _USED_BIT:
+                score_bits = words[index + 1]
+                if words[index] ^ score_bits ^ info == key:
+                    move = info >> 16 & 0xFF
+                    return (info & 0xFF, info >> 8 & 0xFF,
+                            _FLOAT.unpack(_WORD.pack(score_bits))[0],
+                            None if move == NO_MOVE & 0xFF else move)
+        return None
+
+    def store(self, key: int, depth: int, flag: int, score: Union[int, float],
+              move: Optional[int]) -> None:
+        """Store the result of searching the game state with hash <key> to depth <depth> in this
+        table, replacing an older entry according to self.policy.
+
+        Preconditions:
+            - 0 <= depth <= 127
+            - flag in {EXACT, LOWER_BOUND, UPPER_BOUND}
+        """
+        words = self._words
+        index = (key % self._buckets) * self._slots * _ENTRY_WORDS
+
+        if self.policy != ALWAYS_REPLACE and words[index + 2] & _USED_BIT \
+                and words[index + 2] & 0xFF > depth:
+            if self.policy == DEPTH_PREFERRED:
+                return
+            # Keep the deeper search in the depth-preferred entry, and use the always-replace
+            # entry instead
+            index += _ENTRY_WORDS
+
+        info = _pack_info(depth, flag, NO_MOVE if move is None else move)
+        self._scores[index + 1] = score
+        words[index + 2] = info
+        # The check word is written last, so that an entry that is only partly written by one
+        # process while another process reads it does not match its key
+        words[index] = key ^ words[index + 1] ^ info
+
+    def clear(self) -> None:
+        """Remove every entry from this table."""
+        self._array[:] = 0
+
+    def get_size(self) -> int:
+        """Return the maximum number of entries that this table can hold."""
+        return self._buckets * self._slots
+
+
+def get_buffer_size(size: int) -> int:
+    """Return the number of bytes a buffer needs to hold the entries of a transposition table that
+    can hold <size> entries.
+
+    >>> get_buffer_size(1024)
+    24576
+    """
+    return size * _ENTRY_WORDS * _WORD_BYTES
+
+
+def _pack_info(depth: int, flag: int, move: int) -> int:
+    """Return the word that stores the depth, flag and move of a used transposition table entry.
+
+    Each of the three values fits in 8 bits (the move is stored as an unsigned byte, so NO_MOVE
+    is stored as 255).
+
+    >>> _pack_info(4, EXACT, 3) == (4 | 3 << 16 | _USED_BIT)
+    True
+    """
+    return depth | flag << 8 | (move & 0xFF) << 16 | _USED_BIT
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'struct', 'numpy'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
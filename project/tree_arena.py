@@ -0,0 +1,254 @@
+"""CSC111 Winter 2021 Final Project: Connect Four Tree Arena
+
+Module Description
+===============================
+This Python module contains the TreeArena class, which stores the game tree explored by the
+minimax algorithm so that it can be analyzed or visualized after the search.
+
+A GameTree that retains its subtrees keeps a Python object and a full copy of the game for every
+game state it explores, which costs kilobytes per game state. A TreeArena instead stores each game
+state as one row of a handful of parallel numpy arrays (its parent, the move that led to it, its
+score, its first child and its next sibling), which costs 21 bytes per game state, so a tree of a
+million game states fits in about 21 MB. Only the root game state is stored as a game; any other
+game state is rebuilt on demand by replaying the moves that lead to it.
+
+Copyright Information
+===============================
+This file is Copyright (c) 2021 Anis Singh.
+"""
+from typing import Optional, Union
+import numpy as np
+from connect_four import ConnectFourGame
+
+# Global Constants
+ROOT = 0
+
+# The index stored in place of a node that does not exist (e.g., the parent of the root)
+_NO_NODE = -1
+
+
+class TreeArena:
+    """A game tree whose nodes are stored in parallel arrays, where node ROOT is the game state
+    the arena was created for, and every other node is a game state reached from its parent by
+    one move.
+
+    The arrays are allocated with room for a number of nodes up front, and are doubled in size
+    whenever they run out of room.
+
+    >>> game = ConnectFourGame()
+    >>> arena = TreeArena(game, capacity=4)
+    >>> left = arena.add_node(ROOT, 2)
+    >>> right = arena.add_node(ROOT, 4)
+    >>> below = arena.add_node(left, 3)
+    >>> arena.set_score(below, 8)
+    >>> arena.get_children(ROOT)
+    [1, 2]
+    >>> arena.get_path(below)
+    [2, 3]
+    >>> arena.get_game_state(below).get_move_history()
+    [2, 3]
+    >>> (arena.get_score(below), arena.get_score(right))
+    (8.0, None)
+    >>> game.get_move_history()
+    []
+    """
+    # Private Instance Attributes:
+    #   - _game: a copy of the game state of the root node
+    #   - _size: the number of nodes in this arena
+    #   - _parents: the index of the parent of each node
+    #   - _moves: the move that leads from the parent of each node to that node
+    #   - _scores: the score of each node, or nan if it has no score
+    #   - _first_children: the index of the most recently added child of each node
+    #   - _next_siblings: the index of the child of the same parent that was added before each
+    #                     node
+    #
+    # Children are linked from the most recently added one, so that adding a child only needs
+    # to change its parent's first child.
+    _game: ConnectFourGame
+    _size: int
+    _parents: np.ndarray
+    _moves: np.ndarray
+    _scores: np.ndarray
+    _first_children: np.ndarray
+    _next_siblings: np.ndarray
+
+    def __init__(self, game: ConnectFourGame, capacity: int = 2 ** 16) -> None:
+        """Initialize a new arena whose root node is the current state of <game>, with room for
+        <capacity> nodes before it needs to grow. <game> is not mutated.
+
+        Preconditions:
+            - capacity >= 1
+        """
+        self._game = game.copy()
+        self._parents = np.empty(capacity, dtype=np.int32)
+        self._moves = np.empty(capacity, dtype=np.int8)
+        self._scores = np.empty(capacity, dtype=np.float64)
+        self._first_children = np.empty(capacity, dtype=np.int32)
+        self._next_siblings = np.empty(capacity, dtype=np.int32)
+        self._size = 0
+        self._append(_NO_NODE, _NO_NODE)
+
+    def add_node(self, parent: int, move: int) -> int:
+        """Add the game state reached by making <move> in the game state of the node <parent> as
+        a child of <parent>, and return the index of the new node.
+
+        Preconditions:
+            - 0 <= parent < self.get_size()
+            - move is a valid move in the game state of <parent>
+        """
+        node = self._append(parent, move)
+        self._next_siblings[node] = self._first_children[parent]
+        self._first_children[parent] = node
+        return node
+
+    def set_score(self, node: int, score: Union[int, float]) -> None:
+        """Set the score of the node <node> to <score>.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        self._scores[node] = score
+
+    def truncate(self, size: int) -> None:
+        """Remove every node with an index >= <size> from this arena, leaving the nodes that were
+        in it when it had <size> nodes (e.g., to throw away a search that is about to be
+        repeated). The arrays keep their room for nodes.
+
+        Preconditions:
+            - 1 <= size <= self.get_size()
+
+        >>> arena = TreeArena(ConnectFourGame())
+        >>> left = arena.add_node(ROOT, 2)
+        >>> below = arena.add_node(left, 3)
+        >>> right = arena.add_node(ROOT, 4)
+        >>> arena.truncate(below)
+        >>> (arena.get_size(), arena.get_children(ROOT), arena.get_children(left))
+        (2, [1], [])
+        """
+        # The removed nodes were added after every node that is kept, so they come before the
+        # kept nodes in the children of each kept node
+        for node in range(size, self._size):
+            parent = int(self._parents[node])
+            if parent < size:
+                child = int(self._first_children[parent])
+                while child >= size:
+                    child = int(self._next_siblings[child])
+                self._first_children[parent] = child
+        self._size = size
+
+    def get_size(self) -> int:
+        """Return the number of nodes in this arena, including the root."""
+        return self._size
+
+    def get_nbytes(self) -> int:
+        """Return the number of bytes taken up by the arrays of this arena."""
+        return self._parents.nbytes + self._moves.nbytes + self._scores.nbytes \
+            + self._first_children.nbytes + self._next_siblings.nbytes
+
+    def get_parent(self, node: int) -> Optional[int]:
+        """Return the index of the parent of the node <node>, or None if <node> is the root.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        parent = int(self._parents[node])
+        return None if parent == _NO_NODE else parent
+
+    def get_move(self, node: int) -> Optional[int]:
+        """Return the move that leads to the node <node> from its parent, or None if <node> is the
+        root.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        return None if node == ROOT else int(self._moves[node])
+
+    def get_score(self, node: int) -> Optional[float]:
+        """Return the score of the node <node>, or None if it has not been given a score.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        score = float(self._scores[node])
+        return None if np.isnan(score) else score
+
+    def get_children(self, node: int) -> list[int]:
+        """Return the indexes of the children of the node <node>, in the order they were added.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        children = []
+        child = int(self._first_children[node])
+        while child != _NO_NODE:
+            children.append(child)
+            child = int(self._next_siblings[child])
+        children.reverse()
+        return children
+
+    def get_path(self, node: int) -> list[int]:
+        """Return the moves that lead from the root to the node <node>, in the order they are
+        made.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        path = []
+        while node != ROOT:
+            path.append(int(self._moves[node]))
+            node = int(self._parents[node])
+        path.reverse()
+        return path
+
+    def get_game_state(self, node: int) -> ConnectFourGame:
+        """Return a new game in the game state of the node <node>, which is rebuilt by making the
+        moves of get_path(<node>) in a copy of the root game state.
+
+        Preconditions:
+            - 0 <= node < self.get_size()
+        """
+        game = self._game.copy()
+        for move in self.get_path(node):
+            game.make_move(move)
+        return game
+
+    def _append(self, parent: int, move: int) -> int:
+        """Add a node with no score and no children to the end of the arrays of this arena, and
+        return its index. The node is not linked to its parent."""
+        if self._size == len(self._parents):
+            self._grow()
+
+        node = self._size
+        self._parents[node] = parent
+        self._moves[node] = move
+        self._scores[node] = np.nan
+        self._first_children[node] = _NO_NODE
+        self._next_siblings[node] = _NO_NODE
+        self._size += 1
+        return node
+
+    def _grow(self) -> None:
+        """Double the number of nodes that the arrays of this arena have room for."""
+        capacity = 2 * len(self._parents)
+        self._parents = np.resize(self._parents, capacity)
+        self._moves = np.resize(self._moves, capacity)
+        self._scores = np.resize(self._scores, capacity)
+        self._first_children = np.resize(self._first_children, capacity)
+        self._next_siblings = np.resize(self._next_siblings, capacity)
+
+
+if __name__ == '__main__':
+    import python_ta
+    import python_ta.contracts
+
+    python_ta.contracts.check_all_contracts()
+
+    python_ta.check_all(config={
+        'extra-imports': ['python_ta.contracts', 'numpy', 'connect_four'],
+        'allowed-io': [],
+        'max-line-length': 100,
+        'disable': ['E1136']
+    })
+
+    import doctest
+    doctest.testmod(verbose=True)
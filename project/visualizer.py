@@ -196,7 +196,7 @@ def wait_for_quit() -> None:
 def _draw_circle(screen: pygame.Surface, game: ConnectFourGame, row: int, col: int,
                  circle_pos: tuple[int, int]) -> None:
     """Draw the circle that is colour coded corresponding to the player whose piece is
-    placed at game.get_board()[row][col].
+    placed at game.get_board()[row][col] (where row 0 is the top row of the board).
 
     Preconditions:
         - 0 <= row <= game.get_rows() - 1
@@ -204,12 +204,14 @@ def _draw_circle(screen: pygame.Surface, game: ConnectFourGame, row: int, col: i
         - screen.get_width() >= 840
         - screen.get_height() >= 840
     """
-    if game.get_board()[row][col] == EMPTY_PIECE:
+    # The rows of the cells start from the bottom of the board
+    piece = game.get_cells()[(game.get_rows() - 1 - row) * game.get_cols() + col]
+    if piece == EMPTY_PIECE:
         pygame.draw.circle(screen, THECOLORS['white'], circle_pos, RADIUS_OF_CIRCLES)
-    elif game.get_board()[row][col] == RED_PIECE:
+    elif piece == RED_PIECE:
         pygame.draw.circle(screen, THECOLORS['red'], circle_pos, RADIUS_OF_CIRCLES)
     else:
-        assert game.get_board()[row][col] == YELLOW_PIECE
+        assert piece == YELLOW_PIECE
         pygame.draw.circle(screen, THECOLORS['yellow'], circle_pos, RADIUS_OF_CIRCLES)
 
 